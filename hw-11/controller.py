@@ -54,9 +54,11 @@ class ContactController:
                 self.view.show_message("Invalid choice. Try again.")
 
     def load_contacts(self):
-        """Load contacts from file."""
+        """Load contacts from file, adding each one as soon as it is read."""
         try:
-            self.model.contacts = self.file_handler.load_contacts(self._FILE_NAME)
+            self.model.contacts = {}
+            for contact in self.file_handler.iter_contacts(self._FILE_NAME):
+                self.model.add_contact(contact)
         except Exception as e:
             self.view.show_error(f"Error loading contacts: {str(e)}")
 
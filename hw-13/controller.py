@@ -1,6 +1,8 @@
-from exceptions import ContactAlreadyExistsError, ContactNotFoundError
+import os
+
+from exceptions import ContactAlreadyExistsError, ContactNotFoundError, InvalidDataFormatError
 from file_handler import FileHandler
-from model import ContactBook, Contact
+from model import CompactContactBook, ContactBook, Contact
 from view import ContactView
 
 
@@ -9,19 +11,20 @@ class ContactController:
     Controls the flow of the contact book application.
 
     Attributes:
-        model (ContactBook): The contact book model.
+        model (ContactBook | CompactContactBook): The contact book model.
         view (ContactView): The view for user interaction.
         file_handler (FileHandler): Handles file operations.
     """
 
     _FILE_NAME: str = 'contact_book.json'
+    _SNAPSHOT_FILE_NAME: str = 'contact_book.snap'
 
-    def __init__(self, model: ContactBook, view: ContactView):
+    def __init__(self, model: ContactBook | CompactContactBook, view: ContactView):
         """
         Initializes the contact controller.
 
         Args:
-            model (ContactBook): The contact book model.
+            model (ContactBook | CompactContactBook): The contact book model.
             view (ContactView): The view for user interaction.
         """
         self.model = model
@@ -54,12 +57,32 @@ class ContactController:
                 self.view.show_message("Invalid choice. Try again.")
 
     def load_contacts(self):
-        """Load contacts from file."""
+        """
+        Load contacts from file.
+
+        The binary snapshot is used when it is at least as new as the JSON
+        file; otherwise the JSON file is streamed into the book.
+        """
         try:
-            self.model.contacts = self.file_handler.load_contacts(self._FILE_NAME)
+            if self._snapshot_is_current():
+                try:
+                    self.model.attach_snapshot(self.file_handler.open_snapshot(self._SNAPSHOT_FILE_NAME))
+                    return
+                except InvalidDataFormatError as e:
+                    self.view.show_error(f"Ignoring snapshot: {str(e)}")
+            self.model.clear()
+            for contact in self.file_handler.iter_contacts(self._FILE_NAME):
+                self.model.add_contact(contact)
         except Exception as e:
             self.view.show_error(f"Error loading contacts: {str(e)}")
 
+    def _snapshot_is_current(self) -> bool:
+        if not os.path.exists(self._SNAPSHOT_FILE_NAME):
+            return False
+        if not os.path.exists(self._FILE_NAME):
+            return True
+        return os.path.getmtime(self._SNAPSHOT_FILE_NAME) >= os.path.getmtime(self._FILE_NAME)
+
     def show_all_contacts(self):
         """Display all contacts in the book."""
         contacts = self.model.get_all_contacts()
@@ -115,9 +138,16 @@ class ContactController:
             self.view.show_error(str(e))
 
     def save_and_exit(self):
-        """Save contacts to file and exit the application."""
+        """
+        Save contacts to file and exit the application.
+
+        The snapshot is written after the JSON file, so it is picked up on
+        the next start.
+        """
         try:
-            self.file_handler.save_contacts(self._FILE_NAME, self.model.get_all_contacts())
+            contacts = self.model.get_all_contacts()
+            self.file_handler.save_contacts(self._FILE_NAME, contacts)
+            self.file_handler.save_snapshot(self._SNAPSHOT_FILE_NAME, contacts)
             self.view.show_message("Contacts saved. Exiting program.")
         except Exception as e:
             self.view.show_error(f"Error saving contacts: {str(e)}")
\ No newline at end of file
@@ -1,9 +1,11 @@
+import sys
+
 from controller import ContactController
-from model import ContactBook
+from model import CompactContactBook, ContactBook
 from view import ContactView
 
 if __name__ == "__main__":
-    contact_book = ContactBook()
+    contact_book = CompactContactBook() if '--compact' in sys.argv else ContactBook()
     view = ContactView()
     controller = ContactController(contact_book, view)
     controller.run()
\ No newline at end of file
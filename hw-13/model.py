@@ -1,5 +1,11 @@
+from array import array
+from typing import TYPE_CHECKING, Iterator
+
 from exceptions import ContactAlreadyExistsError, ContactNotFoundError
 
+if TYPE_CHECKING:
+    from snapshot import ContactSnapshot
+
 
 class Contact:
     """
@@ -11,6 +17,8 @@ class Contact:
         email (str): The email address of the contact.
     """
 
+    __slots__ = ('name', 'phone', 'email')
+
     def __init__(self, name: str, phone: str, email: str):
         """
         Initializes a new contact.
@@ -27,6 +35,15 @@ class Contact:
     def __repr__(self):
         return f"Contact(name='{self.name}', phone='{self.phone}', email='{self.email}')"
 
+    def __eq__(self, other):
+        if not isinstance(other, Contact):
+            return NotImplemented
+        return (self.name, self.phone, self.email) == (other.name, other.phone, other.email)
+
+    def __hash__(self):
+        # Equal contacts always have equal phones, so the phone is enough for the hash
+        return hash(self.phone)
+
 
 class ContactBook:
     """
@@ -40,6 +57,9 @@ class ContactBook:
         contacts (dict[str, Contact]): A dictionary to store contacts,
                                        where the key is the phone number
                                        and the value is a Contact object.
+        _snapshot (ContactSnapshot | None): An attached read-only snapshot whose
+                                            contacts are materialized on demand.
+        _deleted (set[str]): Phones deleted from the attached snapshot.
     """
 
     _instance = None
@@ -55,8 +75,34 @@ class ContactBook:
         if cls._instance is None:
             cls._instance = super(ContactBook, cls).__new__(cls)
             cls._instance.contacts = {}
+            cls._instance._snapshot = None
+            cls._instance._deleted = set()
         return cls._instance
 
+    def attach_snapshot(self, snapshot: 'ContactSnapshot') -> None:
+        """
+        Use a memory-mapped snapshot as the base layer of the contact book.
+
+        Contacts of the snapshot are not loaded up front: each one is built
+        the first time it is looked up, and changes are kept in ``contacts``.
+
+        Args:
+            snapshot (ContactSnapshot): The snapshot to attach.
+        """
+        self.clear()
+        self._snapshot = snapshot
+
+    def _detach_snapshot(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        self._deleted.clear()
+
+    def _contains(self, phone: str) -> bool:
+        if phone in self.contacts:
+            return True
+        return self._snapshot is not None and phone not in self._deleted and phone in self._snapshot
+
     def add_contact(self, contact: Contact) -> None:
         """
         Add a new contact to the contact book.
@@ -67,7 +113,7 @@ class ContactBook:
         Raises:
             ContactAlreadyExistsError: If a contact with the same phone number already exists.
         """
-        if contact.phone in self.contacts:
+        if self._contains(contact.phone):
             raise ContactAlreadyExistsError(f"Contact with phone {contact.phone} already exists.")
         self.contacts[contact.phone] = contact
 
@@ -81,7 +127,12 @@ class ContactBook:
         Returns:
             Contact | None: The found contact, or None if not found.
         """
-        return self.contacts.get(phone)
+        contact = self.contacts.get(phone)
+        if contact is None and self._snapshot is not None and phone not in self._deleted:
+            contact = self._snapshot.find(phone)
+            if contact is not None:
+                self.contacts[phone] = contact
+        return contact
 
     def edit_contact(self, phone: str, name: str, email: str) -> None:
         """
@@ -111,18 +162,271 @@ class ContactBook:
         Raises:
             ContactNotFoundError: If the contact with the specified phone number is not found.
         """
-        if phone not in self.contacts:
+        if not self._contains(phone):
             raise ContactNotFoundError(f"Contact with phone {phone} not found.")
-        del self.contacts[phone]
+        self.contacts.pop(phone, None)
+        if self._snapshot is not None:
+            self._deleted.add(phone)
 
     def get_all_contacts(self) -> dict[str, Contact]:
         """
         Get all contacts in the contact book.
 
+        If a snapshot is attached, all of its remaining contacts are
+        materialized and the snapshot is detached.
+
         Returns:
             dict[str, Contact]: A dictionary of all contacts.
         """
+        if self._snapshot is not None:
+            for contact in self._snapshot:
+                if contact.phone not in self.contacts and contact.phone not in self._deleted:
+                    self.contacts[contact.phone] = contact
+            self._detach_snapshot()
         return self.contacts
 
     def clear(self) -> None:
-        self.contacts.clear()
\ No newline at end of file
+        self.contacts.clear()
+        self._detach_snapshot()
+
+
+class CompactContactBook:
+    """
+    A memory-compact contact book with the same public API as ContactBook.
+
+    Instead of one Contact object per entry, all strings are stored UTF-8
+    encoded in a single byte heap, with per-row columns of offsets and lengths,
+    and an open-addressing hash table maps phones to rows. Contact objects are
+    only created when a contact is read, so each entry costs a few dozen bytes
+    of columns instead of several Python objects.
+
+    Contacts returned by this class are detached copies: changes must be made
+    through ``edit_contact``.
+
+    Attributes:
+        _heap (bytearray): Concatenated ``phone + name + email`` records.
+        _offsets (array): Start offset of each row's record in the heap.
+        _phone_lengths (array): Byte length of each row's phone (``_DEAD_ROW`` if deleted).
+        _name_lengths (array): Byte length of each row's name.
+        _email_lengths (array): Byte length of each row's email.
+        _slots (array): Hash table of row numbers keyed by the phone.
+    """
+
+    _EMPTY_SLOT: int = -1
+    _DELETED_SLOT: int = -2
+    _DEAD_ROW: int = 0xFFFFFFFF
+    _MIN_SLOTS: int = 8
+
+    def __init__(self):
+        """Initializes an empty compact contact book."""
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        """Remove all contacts."""
+        self._heap = bytearray()
+        self._offsets = array('Q')
+        self._phone_lengths = array('I')
+        self._name_lengths = array('I')
+        self._email_lengths = array('I')
+        self._slots = array('i', [self._EMPTY_SLOT]) * self._MIN_SLOTS
+        self._used_slots = 0
+        self._count = 0
+        self._garbage = 0
+
+    def attach_snapshot(self, snapshot: 'ContactSnapshot') -> None:
+        """
+        Replace the contents of the book with the contacts of a snapshot.
+
+        The compact book keeps its strings in its own heap, so the contacts
+        are copied one by one and the snapshot is closed afterwards.
+
+        Args:
+            snapshot (ContactSnapshot): The snapshot to load.
+        """
+        self.clear()
+        with snapshot:
+            for contact in snapshot:
+                self.add_contact(contact)
+
+    def add_contact(self, contact: Contact) -> None:
+        """
+        Add a new contact to the contact book.
+
+        Args:
+            contact (Contact): The contact to be added.
+
+        Raises:
+            ContactAlreadyExistsError: If a contact with the same phone number already exists.
+        """
+        key = contact.phone.encode('UTF-8')
+        if self._find_slot(key) >= 0:
+            raise ContactAlreadyExistsError(f"Contact with phone {contact.phone} already exists.")
+        row = len(self._offsets)
+        self._offsets.append(0)
+        self._phone_lengths.append(0)
+        self._name_lengths.append(0)
+        self._email_lengths.append(0)
+        self._write_row(row, key, contact.name, contact.email)
+        self._count += 1
+        if (self._used_slots + 1) * 3 >= len(self._slots) * 2:
+            self._rebuild_slots()
+        self._insert_slot(key, row)
+
+    def find_contact(self, phone: str) -> Contact | None:
+        """
+        Find a contact by phone number.
+
+        Args:
+            phone (str): The phone number to search for.
+
+        Returns:
+            Contact | None: The found contact, or None if not found.
+        """
+        slot = self._find_slot(phone.encode('UTF-8'))
+        if slot < 0:
+            return None
+        return self._contact_at(self._slots[slot])
+
+    def edit_contact(self, phone: str, name: str, email: str) -> None:
+        """
+        Edit an existing contact's information.
+
+        Args:
+            phone (str): The phone number of the contact to edit.
+            name (str): The new name for the contact.
+            email (str): The new email for the contact.
+
+        Raises:
+            ContactNotFoundError: If the contact with the specified phone number is not found.
+        """
+        key = phone.encode('UTF-8')
+        slot = self._find_slot(key)
+        if slot < 0:
+            raise ContactNotFoundError(f"Contact with phone {phone} not found.")
+        row = self._slots[slot]
+        self._garbage += self._row_size(row)
+        self._write_row(row, key, name, email)
+        self._vacuum_if_needed()
+
+    def delete_contact(self, phone: str) -> None:
+        """
+        Delete a contact from the contact book.
+
+        Args:
+            phone (str): The phone number of the contact to delete.
+
+        Raises:
+            ContactNotFoundError: If the contact with the specified phone number is not found.
+        """
+        slot = self._find_slot(phone.encode('UTF-8'))
+        if slot < 0:
+            raise ContactNotFoundError(f"Contact with phone {phone} not found.")
+        row = self._slots[slot]
+        self._garbage += self._row_size(row)
+        self._phone_lengths[row] = self._DEAD_ROW
+        self._slots[slot] = self._DELETED_SLOT
+        self._count -= 1
+        self._vacuum_if_needed()
+
+    def get_all_contacts(self) -> dict[str, Contact]:
+        """
+        Get all contacts in the contact book.
+
+        The dictionary is built on every call, so changing it does not
+        affect the contact book.
+
+        Returns:
+            dict[str, Contact]: A dictionary of all contacts.
+        """
+        return {contact.phone: contact for contact in self._iter_contacts()}
+
+    def _iter_contacts(self) -> Iterator[Contact]:
+        for row in range(len(self._offsets)):
+            if self._phone_lengths[row] != self._DEAD_ROW:
+                yield self._contact_at(row)
+
+    def _row_size(self, row: int) -> int:
+        return self._phone_lengths[row] + self._name_lengths[row] + self._email_lengths[row]
+
+    def _write_row(self, row: int, key: bytes, name: str, email: str) -> None:
+        name_bytes = name.encode('UTF-8')
+        email_bytes = email.encode('UTF-8')
+        self._offsets[row] = len(self._heap)
+        self._phone_lengths[row] = len(key)
+        self._name_lengths[row] = len(name_bytes)
+        self._email_lengths[row] = len(email_bytes)
+        self._heap += key
+        self._heap += name_bytes
+        self._heap += email_bytes
+
+    def _phone_at(self, row: int) -> bytes:
+        start = self._offsets[row]
+        return bytes(self._heap[start:start + self._phone_lengths[row]])
+
+    def _contact_at(self, row: int) -> Contact:
+        start = self._offsets[row]
+        name_start = start + self._phone_lengths[row]
+        email_start = name_start + self._name_lengths[row]
+        return Contact(
+            self._heap[name_start:email_start].decode('UTF-8'),
+            self._heap[start:name_start].decode('UTF-8'),
+            self._heap[email_start:email_start + self._email_lengths[row]].decode('UTF-8'),
+        )
+
+    def _find_slot(self, key: bytes) -> int:
+        mask = len(self._slots) - 1
+        slot = hash(key) & mask
+        while True:
+            row = self._slots[slot]
+            if row == self._EMPTY_SLOT:
+                return -1
+            if row >= 0 and self._phone_lengths[row] == len(key) and self._phone_at(row) == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _insert_slot(self, key: bytes, row: int) -> None:
+        mask = len(self._slots) - 1
+        slot = hash(key) & mask
+        while self._slots[slot] >= 0:
+            slot = (slot + 1) & mask
+        if self._slots[slot] == self._EMPTY_SLOT:
+            self._used_slots += 1
+        self._slots[slot] = row
+
+    def _rebuild_slots(self) -> None:
+        size = self._MIN_SLOTS
+        while size * 2 < self._count * 3 + 3:
+            size *= 2
+        self._slots = array('i', [self._EMPTY_SLOT]) * size
+        self._used_slots = 0
+        for row in range(len(self._offsets)):
+            if self._phone_lengths[row] != self._DEAD_ROW:
+                self._insert_slot(self._phone_at(row), row)
+
+    def _vacuum_if_needed(self) -> None:
+        if self._garbage * 2 <= len(self._heap):
+            return
+        heap = bytearray()
+        offsets = array('Q')
+        phone_lengths = array('I')
+        name_lengths = array('I')
+        email_lengths = array('I')
+        for row in range(len(self._offsets)):
+            if self._phone_lengths[row] == self._DEAD_ROW:
+                continue
+            start = self._offsets[row]
+            offsets.append(len(heap))
+            heap += self._heap[start:start + self._row_size(row)]
+            phone_lengths.append(self._phone_lengths[row])
+            name_lengths.append(self._name_lengths[row])
+            email_lengths.append(self._email_lengths[row])
+        self._heap = heap
+        self._offsets = offsets
+        self._phone_lengths = phone_lengths
+        self._name_lengths = name_lengths
+        self._email_lengths = email_lengths
+        self._garbage = 0
+        self._rebuild_slots()
@@ -0,0 +1,163 @@
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator
+
+from exceptions import InvalidDataFormatError
+from model import Contact
+
+
+class ContactSnapshot:
+    """
+    A read-only, memory-mapped binary snapshot of a contact book.
+
+    File layout (little-endian):
+        header: magic (8 bytes), number of contacts (uint64);
+        offset table: one entry per contact, sorted by the UTF-8 bytes of the phone,
+                      holding the record offset in the heap (uint64) and the byte
+                      lengths of phone, name and email (uint32 each);
+        string heap: concatenated UTF-8 ``phone + name + email`` records.
+
+    Opening a snapshot only maps the file, so it takes constant time regardless
+    of the number of contacts. Lookups binary-search the offset table and a
+    ``Contact`` is built only for records that are actually read.
+
+    Attributes:
+        filename (str): The path of the snapshot file.
+    """
+
+    MAGIC: bytes = b'CBSNAP01'
+    _HEADER = struct.Struct('<8sQ')
+    _ENTRY = struct.Struct('<QIII')
+
+    def __init__(self, filename: str):
+        """
+        Opens and maps a snapshot file.
+
+        Args:
+            filename (str): The path of the snapshot file.
+
+        Raises:
+            InvalidDataFormatError: If the file is not a valid contact snapshot.
+        """
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise InvalidDataFormatError("Invalid snapshot format in file")
+
+        if len(self._map) < self._HEADER.size:
+            self.close()
+            raise InvalidDataFormatError("Invalid snapshot format in file")
+        magic, self._count = self._HEADER.unpack_from(self._map, 0)
+        self._heap_offset = self._HEADER.size + self._count * self._ENTRY.size
+        if magic != self.MAGIC or len(self._map) < self._heap_offset:
+            self.close()
+            raise InvalidDataFormatError("Invalid snapshot format in file")
+
+    def close(self) -> None:
+        """Unmap and close the snapshot file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> 'ContactSnapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, phone: str) -> bool:
+        return self._find_index(phone) is not None
+
+    def __iter__(self) -> Iterator[Contact]:
+        """
+        Iterate over all contacts in phone order, building them one at a time.
+
+        Yields:
+            Contact: The next contact of the snapshot.
+        """
+        for index in range(self._count):
+            yield self._contact_at(index)
+
+    def find(self, phone: str) -> Contact | None:
+        """
+        Find a contact by phone number.
+
+        Args:
+            phone (str): The phone number to search for.
+
+        Returns:
+            Contact | None: The found contact, or None if not found.
+        """
+        index = self._find_index(phone)
+        if index is None:
+            return None
+        return self._contact_at(index)
+
+    def _entry(self, index: int) -> tuple[int, int, int, int]:
+        return self._ENTRY.unpack_from(self._map, self._HEADER.size + index * self._ENTRY.size)
+
+    def _phone_at(self, index: int) -> bytes:
+        offset, phone_len, _, _ = self._entry(index)
+        start = self._heap_offset + offset
+        return self._map[start:start + phone_len]
+
+    def _contact_at(self, index: int) -> Contact:
+        offset, phone_len, name_len, email_len = self._entry(index)
+        start = self._heap_offset + offset
+        name_start = start + phone_len
+        email_start = name_start + name_len
+        return Contact(
+            self._map[name_start:email_start].decode('UTF-8'),
+            self._map[start:name_start].decode('UTF-8'),
+            self._map[email_start:email_start + email_len].decode('UTF-8'),
+        )
+
+    def _find_index(self, phone: str) -> int | None:
+        key = phone.encode('UTF-8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._phone_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._phone_at(low) == key:
+            return low
+        return None
+
+    @classmethod
+    def write(cls, filename: str, contacts: Iterable[Contact]) -> None:
+        """
+        Write contacts to a snapshot file.
+
+        The file is written to a temporary path first and then atomically
+        renamed, so readers never see a partially written snapshot.
+
+        Args:
+            filename (str): The path of the snapshot file.
+            contacts (Iterable[Contact]): The contacts to save.
+        """
+        records = sorted(
+            (contact.phone.encode('UTF-8'), contact.name.encode('UTF-8'), contact.email.encode('UTF-8'))
+            for contact in contacts
+        )
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'wb') as file:
+            file.write(cls._HEADER.pack(cls.MAGIC, len(records)))
+            offset = 0
+            for phone, name, email in records:
+                file.write(cls._ENTRY.pack(offset, len(phone), len(name), len(email)))
+                offset += len(phone) + len(name) + len(email)
+            for phone, name, email in records:
+                file.write(phone)
+                file.write(name)
+                file.write(email)
+        os.replace(tmp_filename, filename)
@@ -1,5 +1,5 @@
 import pytest
-from model import ContactBook
+from model import CompactContactBook, ContactBook
 from file_handler import FileHandler
 
 
@@ -18,6 +18,18 @@ def contact_book():
 
 
 
+@pytest.fixture
+def compact_contact_book():
+    """
+    Fixture to provide an empty CompactContactBook.
+
+    Returns:
+        CompactContactBook: A new instance of CompactContactBook with no contacts.
+    """
+    return CompactContactBook()
+
+
+
 @pytest.fixture
 def file_handler():
     """
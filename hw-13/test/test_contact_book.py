@@ -1,8 +1,12 @@
 import json
+import os
+import tracemalloc
 import pytest
-from model import Contact, ContactBook
+from controller import ContactController
+from model import CompactContactBook, Contact, ContactBook
 from exceptions import ContactAlreadyExistsError, ContactNotFoundError, InvalidDataFormatError
 from file_handler import FileHandler
+from view import ContactView
 
 
 
@@ -160,4 +164,198 @@ def test_invalid_data_format(file_handler, tmp_path):
     with open(file_path, 'w', encoding='UTF-8') as file:
         json.dump(invalid_data, file)
     with pytest.raises(InvalidDataFormatError):
-        file_handler.load_contacts(file_path)
\ No newline at end of file
+        file_handler.load_contacts(file_path)
+
+
+def test_iter_contacts_streams_in_small_chunks(file_handler, tmp_path):
+    """
+    Test that contacts are parsed correctly when the file is read in tiny chunks.
+
+    Args:
+        file_handler (FileHandler): The file handler instance.
+        tmp_path (pathlib.Path): Temporary directory provided by pytest.
+    """
+    data = {
+        "+1234567890": ["Ivanov Peter", "ivanov.peter@example.com"],
+        "+0987654321": ["Петров \"Иван\"", "petrov.ivan@example.com"],
+    }
+    file_path = tmp_path / "test_contact_book.json"
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+    contacts = list(file_handler.iter_contacts(file_path, chunk_size=3))
+    assert [contact.phone for contact in contacts] == list(data)
+    assert contacts[1].name == "Петров \"Иван\""
+
+
+
+def test_iter_contacts_reports_invalid_phone(file_handler, tmp_path):
+    """
+    Test that the phone of an invalid entry is reported by the streaming loader.
+
+    Args:
+        file_handler (FileHandler): The file handler instance.
+        tmp_path (pathlib.Path): Temporary directory provided by pytest.
+    """
+    file_path = tmp_path / "invalid_contact_book.json"
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        file.write('{"+1234567890": ["Ivanov Peter", "ivanov.peter@example.com"], "+0987654321": ["Petrov Ivan"]}')
+    with pytest.raises(InvalidDataFormatError, match=r"\+0987654321"):
+        file_handler.load_contacts(file_path)
+
+
+
+def test_load_contacts_truncated_json(file_handler, tmp_path):
+    """
+    Test handling a truncated JSON file.
+
+    Args:
+        file_handler (FileHandler): The file handler instance.
+        tmp_path (pathlib.Path): Temporary directory provided by pytest.
+    """
+    file_path = tmp_path / "truncated_contact_book.json"
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        file.write('{"+1234567890": ["Ivanov Peter", "ivanov.pe')
+    with pytest.raises(InvalidDataFormatError, match="Invalid JSON format"):
+        file_handler.load_contacts(file_path)
+
+
+
+def test_snapshot_round_trip(file_handler, tmp_path):
+    """
+    Test converting contacts from JSON to a binary snapshot and back.
+
+    Args:
+        file_handler (FileHandler): The file handler instance.
+        tmp_path (pathlib.Path): Temporary directory provided by pytest.
+    """
+    data = {
+        "+79876543210": ["Соланов Роман", "rsolanov@gmail.com"],
+        "+1234567890": ["Ivanov Peter", "ivanov.peter@example.com"],
+    }
+    json_path = tmp_path / "contact_book.json"
+    snapshot_path = tmp_path / "contact_book.snap"
+    restored_path = tmp_path / "restored_contact_book.json"
+    with open(json_path, 'w', encoding='UTF-8') as file:
+        json.dump(data, file)
+    file_handler.json_to_snapshot(json_path, snapshot_path)
+    file_handler.snapshot_to_json(snapshot_path, restored_path)
+    with open(restored_path, 'r', encoding='UTF-8') as file:
+        assert json.load(file) == data
+    with file_handler.open_snapshot(snapshot_path) as snapshot:
+        assert len(snapshot) == 2
+        assert snapshot.find("+79876543210").name == "Соланов Роман"
+        assert snapshot.find("+70000000000") is None
+
+
+
+def test_contact_book_with_snapshot(contact_book, file_handler, tmp_path):
+    """
+    Test that a contact book backed by a snapshot materializes contacts lazily.
+
+    Args:
+        contact_book (ContactBook): The contact book instance.
+        file_handler (FileHandler): The file handler instance.
+        tmp_path (pathlib.Path): Temporary directory provided by pytest.
+    """
+    snapshot_path = tmp_path / "contact_book.snap"
+    file_handler.save_snapshot(snapshot_path, {
+        "+1234567890": Contact("Ivanov Peter", "+1234567890", "ivanov.peter@example.com"),
+        "+0987654321": Contact("Petrov Ivan", "+0987654321", "petrov.ivan@example.com"),
+    })
+    contact_book.attach_snapshot(file_handler.open_snapshot(snapshot_path))
+    assert contact_book.contacts == {}
+
+    contact_book.edit_contact("+1234567890", "Sidorov Ivan", "sidorov.ivan@example.com")
+    assert contact_book.find_contact("+1234567890").name == "Sidorov Ivan"
+    contact_book.delete_contact("+0987654321")
+    assert contact_book.find_contact("+0987654321") is None
+    with pytest.raises(ContactAlreadyExistsError):
+        contact_book.add_contact(Contact("Ivanov Peter", "+1234567890", "ivanov.peter@example.com"))
+
+    assert list(contact_book.get_all_contacts()) == ["+1234567890"]
+
+
+
+@pytest.mark.parametrize("book_class", [ContactBook, CompactContactBook])
+def test_controller_loads_current_snapshot(book_class, tmp_path, monkeypatch):
+    """
+    Test that the controller writes a snapshot on save and prefers it on start
+    unless the JSON file is newer.
+
+    Args:
+        book_class (type): The contact book class to load into.
+        tmp_path (pathlib.Path): Temporary directory provided by pytest.
+        monkeypatch (pytest.MonkeyPatch): Used to run in the temporary directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    book = book_class()
+    book.clear()
+    book.add_contact(Contact("Ivanov Peter", "+1234567890", "ivanov.peter@example.com"))
+    ContactController(book, ContactView()).save_and_exit()
+    assert os.path.exists("contact_book.snap")
+
+    book.clear()
+    ContactController(book, ContactView()).load_contacts()
+    if book_class is ContactBook:
+        assert book._snapshot is not None
+    assert book.find_contact("+1234567890").name == "Ivanov Peter"
+
+    with open("contact_book.json", "w", encoding="UTF-8") as file:
+        json.dump({"+0987654321": ["Petrov Ivan", "petrov.ivan@example.com"]}, file)
+    snapshot_time = os.path.getmtime("contact_book.snap")
+    os.utime("contact_book.json", (snapshot_time + 1, snapshot_time + 1))
+    ContactController(book, ContactView()).load_contacts()
+    assert list(book.get_all_contacts()) == ["+0987654321"]
+
+
+def test_compact_contact_book_operations(compact_contact_book):
+    """
+    Test the public API of the compact contact book.
+
+    Args:
+        compact_contact_book (CompactContactBook): The compact contact book instance.
+    """
+    contact = Contact("Ivanov Peter", "+1234567890", "ivanov.peter@example.com")
+    compact_contact_book.add_contact(contact)
+    assert compact_contact_book.find_contact("+1234567890") == contact
+    with pytest.raises(ContactAlreadyExistsError):
+        compact_contact_book.add_contact(contact)
+
+    compact_contact_book.edit_contact("+1234567890", "Петров Иван", "petrov.ivan@example.com")
+    edited_contact = compact_contact_book.find_contact("+1234567890")
+    assert edited_contact.name == "Петров Иван"
+    assert edited_contact.email == "petrov.ivan@example.com"
+
+    compact_contact_book.delete_contact("+1234567890")
+    assert compact_contact_book.find_contact("+1234567890") is None
+    assert compact_contact_book.get_all_contacts() == {}
+    with pytest.raises(ContactNotFoundError):
+        compact_contact_book.delete_contact("+1234567890")
+    with pytest.raises(ContactNotFoundError):
+        compact_contact_book.edit_contact("+1234567890", "Petrov Ivan", "petrov.ivan@example.com")
+
+
+
+def test_compact_contact_book_memory(contact_book, compact_contact_book):
+    """
+    Test that the compact contact book uses at least 3 times less memory.
+
+    The measured ratio is about 3.3. The sample is large enough that fixed
+    allocations of the hash table and arrays do not skew it.
+
+    Args:
+        contact_book (ContactBook): The contact book instance.
+        compact_contact_book (CompactContactBook): The compact contact book instance.
+    """
+    def traced_size(book) -> int:
+        tracemalloc.start()
+        for i in range(50000):
+            book.add_contact(Contact(f"Иванов Пётр {i}", f"+7912{i:07d}", f"ivanov.peter.{i}@example.com"))
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return size
+
+    dict_size = traced_size(contact_book)
+    compact_size = traced_size(compact_contact_book)
+    assert len(compact_contact_book.get_all_contacts()) == 50000
+    assert compact_size * 3 <= dict_size
@@ -1,56 +1,281 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.models.contact import Contact, ContactBook
-from app.utils.file_handler import FileHandler
-from app.exceptions import ContactAlreadyExistsError, ContactNotFoundError
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.models.batch import BatchOperation
+from app.models.contact import Contact, normalize_name
+from app.repositories.factory import create_repository
+from app.utils.snapshot_scheduler import SnapshotScheduler
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.export import EXPORT_FORMATS, encode_contact_list, encode_contact_map
+from app.utils.cache import VersionedLRUCache, VersionedResponseCache, etag_matches
+from app.utils.compression import choose_encoding, gzip_compress, iter_gzip
+from app.utils.fuzzy import fuzzy_words
+from app.utils.singleflight import SingleFlight
+from app.utils.executor import Executor, LoopLagMonitor
+from app.utils.profiling import current_profile
+from app.utils.progress import LoadProgress
+from app.exceptions import ContactAlreadyExistsError, ContactNotFoundError, InvalidCursorError, StorageNotReadyError
+from app.config import SNAPSHOT_INTERVAL, SNAPSHOT_DIRTY_THRESHOLD, FUZZY_MAX_DISTANCE, PAGE_SIZE, MAX_PAGE_SIZE
+from app.config import EXPORT_CHUNK_SIZE, SEARCH_CACHE_SIZE, MAX_BATCH_SIZE
+from app.config import EXECUTOR_WORKERS, EXECUTOR_MAX_PENDING, EXECUTOR_TIMEOUT, READY_WAIT_TIMEOUT
+from app.config import COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE
+import asyncio
+import json
 import logging
+from functools import partial
+from typing import Any, Awaitable, Callable
 
 router = APIRouter()
-contact_book = ContactBook()
-file_handler = FileHandler()
-FILE_NAME = "contact_book.json"
+repository = create_repository()
+snapshot_scheduler = SnapshotScheduler(repository, SNAPSHOT_INTERVAL, SNAPSHOT_DIRTY_THRESHOLD)
+
+PHONE_CHARS = set("+0123456789 -()")
+
+# Сериализованный полный список контактов для текущей версии книги, несжатый и в gzip
+contacts_response_cache = VersionedResponseCache()
+contacts_gzip_cache = VersionedResponseCache()
+
+# Результаты поиска (JSON или None, если ничего не найдено) для текущей версии книги
+search_cache = VersionedLRUCache(SEARCH_CACHE_SIZE)
+NOT_CACHED = object()
+
+# Одинаковые одновременные запросы на чтение выполняются один раз
+single_flight = SingleFlight()
+
+# Тяжёлые операции выполняются в пуле потоков, а не в цикле событий
+executor = Executor(EXECUTOR_WORKERS, EXECUTOR_MAX_PENDING, EXECUTOR_TIMEOUT)
+loop_lag_monitor = LoopLagMonitor()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@router.on_event("startup")
+# Книга загружается в фоне: до конца загрузки запросы к данным получают 503
+load_progress = LoadProgress()
+contacts_ready = asyncio.Event()
+load_task = None
+
+
 async def load_contacts():
     """
-    Загрузка контактов из файла при запуске приложения.
+    Запуск фоновой загрузки контактов. Приложение начинает принимать запросы сразу,
+    время запуска не зависит от размера книги.
     """
-    try:
-        contacts = file_handler.load_contacts(FILE_NAME)
+    global load_task
+    loop_lag_monitor.start()
+    # Рабочий процесс без доступа к хранилищу не должен обслуживать запросы
+    repository.acquire()
+    load_task = asyncio.create_task(warm_up())
 
-        contact_book.contacts.clear()
 
-        for contact in contacts.values():
-            contact_book.contacts[contact.phone] = contact
-        logger.info("Contacts loaded successfully.")
+async def warm_up():
+    """
+    Загрузка книги в пуле потоков и запуск фоновых снимков.
+    """
+    try:
+        # Загрузка книги может быть долгой, поэтому без таймаута
+        await executor.run(repository.open, load_progress, timeout=None)
     except Exception as e:
+        load_progress.finish(e)
         logger.error(f"Error loading contacts: {e}")
+        return
+    load_progress.finish()
+    contacts_ready.set()
+    snapshot_scheduler.start()
+    logger.info(f"{load_progress.contacts} contacts loaded in {load_progress.stats()['elapsed']} s.")
 
 
-@router.on_event("shutdown")
 async def save_contacts():
     """
-    Сохранение контактов в файл при завершении работы приложения.
+    Сохранение контактов при завершении работы приложения.
+    Незавершённая загрузка прерывается; недозагруженная книга не сохраняется,
+    чтобы не затереть снимок.
     """
-    try:
-        file_handler.save_contacts(FILE_NAME, contact_book.get_all_contacts())
-        logger.info("Contacts saved successfully.")
-    except Exception as e:
-        logger.error(f"Error saving contacts: {e}")
+    if load_task is not None and not load_task.done():
+        load_progress.cancel()
+        await load_task
+    if contacts_ready.is_set():
+        try:
+            await snapshot_scheduler.stop()
+            await executor.run(repository.close, timeout=None)
+            logger.info("Contacts saved successfully.")
+        except Exception as e:
+            logger.error(f"Error saving contacts: {e}")
+    executor.shutdown()
+    await loop_lag_monitor.stop()
+
+
+async def wait_for_contacts():
+    """
+    Запрос к данным ждёт загрузку книги не дольше READY_WAIT_TIMEOUT секунд,
+    затем получает 503 с Retry-After.
+    """
+    if contacts_ready.is_set():
+        return
+    if READY_WAIT_TIMEOUT > 0 and load_progress.error is None:
+        try:
+            await asyncio.wait_for(contacts_ready.wait(), READY_WAIT_TIMEOUT)
+            return
+        except asyncio.TimeoutError:
+            pass
+    if load_progress.error is not None:
+        raise StorageNotReadyError(f"Contacts failed to load: {load_progress.error}")
+    raise StorageNotReadyError("Contacts are still loading, try again later.")
+
+
+@router.get("/snapshots/stats")
+async def get_snapshot_stats():
+    """
+    Возвращает метрики фоновых снимков (количество, длительность последнего).
+    """
+    return snapshot_scheduler.stats()
 
 
-@router.get("/contacts/")
-async def get_contacts():
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Возвращает счётчики попаданий и промахов кэша поиска и объединённых запросов.
+    """
+    return {"search": search_cache.stats(), "single_flight": single_flight.stats()}
+
+
+@router.get("/executor/stats")
+async def get_executor_stats():
+    """
+    Возвращает состояние пула тяжёлых операций и задержку цикла событий.
+    """
+    return {**executor.stats(), **loop_lag_monitor.stats()}
+
+
+@router.get("/contacts/", dependencies=[Depends(wait_for_contacts)])
+async def get_contacts(
+        limit: int = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+        cursor: str = Query(None, description="Cursor returned as next_cursor by the previous page"),
+        order: str = Query("phone", pattern="^(phone|name)$", description="Sort order: phone or name"),
+        if_none_match: str = Header(None),
+        accept_encoding: str = Header(None)
+):
     """
     Возвращает список всех контактов.
+    С параметрами limit или cursor возвращает одну страницу и курсор следующей.
+    """
+    if limit is None and cursor is None:
+        return await get_all_contacts_response(if_none_match, accept_encoding)
+    try:
+        after = decode_cursor(cursor, order) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    body = await executor.run(get_page_body, order, after, limit or PAGE_SIZE)
+    return await json_response(body, accept_encoding)
+
+
+def get_page_body(order: str, after: tuple[str, str] | None, limit: int) -> bytes:
+    contacts = repository.get_page(order, after, limit + 1)
+    next_cursor = encode_cursor(order, contacts[limit - 1]) if len(contacts) > limit else None
+    return encode_json({"items": contacts[:limit], "next_cursor": next_cursor})
+
+
+def encode_json(data) -> bytes:
+    """
+    Кодирование ответа в JSON так же, как это делает JSONResponse.
+    """
+    return json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    return COMPRESSION_LEVEL > 0 and choose_encoding(accept_encoding, ("gzip",)) == "gzip"
+
+
+def use_cache() -> bool:
+    """
+    Профилируемый запрос не берёт готовый ответ из кэша, иначе в профиле не будет работы.
+    """
+    return current_profile.get() is None
+
+
+async def run_shared(key: tuple, func: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Одинаковые одновременные запросы выполняются один раз (single_flight);
+    профилируемый запрос выполняется отдельно, чтобы вся работа попала в его профиль.
+    """
+    if current_profile.get() is not None:
+        return await func()
+    return await single_flight.do(key, func)
+
+
+async def json_response(body: bytes, accept_encoding: str | None) -> Response:
+    """
+    JSON-ответ из готового тела. Большое тело сжимается в пуле потоков,
+    чтобы сжатие не задерживало цикл событий, как в GZipMiddleware.
     """
-    return contact_book.get_all_contacts()
+    if len(body) < COMPRESSION_MIN_SIZE or not accepts_gzip(accept_encoding):
+        return Response(content=body, media_type="application/json")
+    return Response(
+        content=await executor.run(gzip_compress, body, COMPRESSION_LEVEL),
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+    )
 
 
-@router.post("/contacts/")
+async def get_all_contacts_response(if_none_match: str | None, accept_encoding: str | None) -> Response:
+    """
+    Полный список контактов с ETag по версии книги.
+    Тело кодируется и сжимается один раз на версию; при совпадении If-None-Match - 304 без тела.
+    """
+    # Версия читается до данных: если книга изменится между ними,
+    # тело окажется новее версии и будет перестроено при следующем запросе
+    version = repository.version()
+    for etag in (f'"{version}"', f'"{version}-gzip"'):
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+    body = contacts_response_cache.get(version) if use_cache() else None
+    if body is None:
+        # Одновременные запросы одной версии ждут одну сериализацию в рабочем потоке
+        body = await run_shared(
+            ("contacts", version),
+            lambda: executor.run(encode_contact_map, repository.iter_contacts(), EXPORT_CHUNK_SIZE),
+        )
+        contacts_response_cache.put(version, body)
+    if len(body) < COMPRESSION_MIN_SIZE or not accepts_gzip(accept_encoding):
+        return Response(
+            content=body, media_type="application/json", headers={"ETag": f'"{version}"', "Vary": "Accept-Encoding"}
+        )
+    compressed = contacts_gzip_cache.get(version) if use_cache() else None
+    if compressed is None:
+        compressed = await run_shared(
+            ("contacts-gzip", version),
+            lambda: executor.run(gzip_compress, body, COMPRESSION_LEVEL),
+        )
+        contacts_gzip_cache.put(version, compressed)
+    return Response(
+        content=compressed,
+        media_type="application/json",
+        headers={"ETag": f'"{version}-gzip"', "Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+    )
+
+
+@router.get("/contacts/export", dependencies=[Depends(wait_for_contacts)])
+async def export_contacts(
+        format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+        accept_encoding: str = Header(None)
+):
+    """
+    Потоковая выгрузка всех контактов в NDJSON или CSV.
+    Контакты читаются из согласованного снимка и сериализуются фрагментами,
+    поэтому первый байт уходит сразу, а память не растёт с размером книги.
+    """
+    media_type, serializer = EXPORT_FORMATS[format]
+    chunks = serializer(repository.iter_contacts(), EXPORT_CHUNK_SIZE)
+    headers = {"Content-Disposition": f'attachment; filename="contacts.{format}"', "Vary": "Accept-Encoding"}
+    if accepts_gzip(accept_encoding):
+        # Фрагменты сжимаются там же, где сериализуются, а не в цикле событий
+        chunks = iter_gzip(chunks, COMPRESSION_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    # Каждый фрагмент читается и сериализуется в пуле потоков
+    return StreamingResponse(executor.iterate(chunks), media_type=media_type, headers=headers)
+
+
+@router.post("/contacts/", dependencies=[Depends(wait_for_contacts)])
 async def add_contact(
         phone: str,
         name: str,
@@ -61,13 +286,35 @@ async def add_contact(
     """
     try:
         new_contact = Contact(name=name, phone=phone, email=email)
-        contact_book.add_contact(new_contact)
+        # Запись ждёт блокировку хранилища (пакет в другом потоке, BEGIN IMMEDIATE
+        # другого процесса), поэтому выполняется в пуле и без таймаута
+        await executor.run(repository.add_contact, new_contact, timeout=None)
         return {"message": "Contact added successfully."}
     except ContactAlreadyExistsError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.patch("/contacts/{phone}")
+@router.post("/contacts/batch", dependencies=[Depends(wait_for_contacts)])
+async def batch_contacts(
+        operations: list[BatchOperation] = Body(..., max_length=MAX_BATCH_SIZE),
+        mode: str = Query("atomic", pattern="^(atomic|best_effort)$", description="atomic or best_effort")
+):
+    """
+    Применяет пакет операций add / edit / delete одним запросом.
+    atomic - всё или ничего (409 и откат при первой ошибке),
+    best_effort - ошибочные операции пропускаются, остальные сохраняются.
+    """
+    atomic = mode == "atomic"
+    # Без таймаута: пакет, снятый по 504, всё равно был бы зафиксирован
+    results = await executor.run(repository.apply_batch, operations, atomic, timeout=None)
+    applied = sum(result.status == "ok" for result in results)
+    # Ответ на большой пакет кодируется в пуле, как и остальные большие ответы
+    body = await executor.run(encode_json, {"applied": applied, "results": results})
+    status_code = 409 if atomic and applied < len(operations) else 200
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+@router.patch("/contacts/{phone}", dependencies=[Depends(wait_for_contacts)])
 async def edit_contact(
         phone: str,
         name: str,
@@ -77,55 +324,104 @@ async def edit_contact(
     Редактирует существующий контакт.
     """
     try:
-        contact = contact_book.find_contact(phone)
-        if not contact:
-            raise ContactNotFoundError(f"Contact with phone {phone} not found.")
-
-        if name:
-            contact.name = name
-        if email:
-            contact.email = email
-
+        await executor.run(update_contact, phone, name, email, timeout=None)
         return {"message": "Contact updated successfully."}
     except ContactNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.delete("/contacts/{phone}")
+def update_contact(phone: str, name: str, email: str) -> None:
+    """
+    Изменение контакта; пустые поля остаются прежними.
+    """
+    contact = repository.find_contact(phone)
+    if not contact:
+        raise ContactNotFoundError(f"Contact with phone {phone} not found.")
+    repository.edit_contact(phone, name or contact.name, email or contact.email)
+
+
+@router.delete("/contacts/{phone}", dependencies=[Depends(wait_for_contacts)])
 async def delete_contact(phone: str):
     """
     Удаляет контакт.
     """
     try:
-        contact_book.delete_contact(phone)
+        await executor.run(repository.delete_contact, phone, timeout=None)
         return {"message": "Contact deleted successfully."}
     except ContactNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.get("/contacts/search/")
+@router.get("/contacts/suggest", dependencies=[Depends(wait_for_contacts)])
+async def suggest_contacts(
+        prefix: str = Query(..., min_length=1, description="Beginning of a name or a phone number"),
+        limit: int = Query(10, ge=1, le=100, description="Maximum number of suggestions")
+):
+    """
+    Подсказки при вводе: контакты, имя или телефон которых начинается с prefix.
+    Если prefix похож на номер телефона, сравниваются только цифры.
+    """
+    if any(char.isdigit() for char in prefix) and all(char in PHONE_CHARS for char in prefix):
+        return await executor.run(repository.suggest_by_phone, prefix, limit)
+    return await executor.run(repository.suggest_by_name, prefix, limit)
+
+
+def run_search(search: Callable[[], Contact | list[Contact] | None]) -> bytes | None:
+    result = search()
+    # Пустой результат тоже кэшируется, чтобы повторные промахи не искали заново
+    if not result:
+        return None
+    if isinstance(result, list):
+        return encode_contact_list(result, EXPORT_CHUNK_SIZE)
+    return encode_json(result)
+
+
+@router.get("/contacts/search/", dependencies=[Depends(wait_for_contacts)])
 async def search_contact(
         phone: str = Query(None, description="Phone number to search"),
-        name: str = Query(None, description="Name to search")
+        name: str = Query(None, description="Name to search"),
+        email: str = Query(None, description="Exact email to search"),
+        exact: bool = Query(False, description="Exact (case-insensitive) name match using the name index"),
+        fuzzy: bool = Query(False, description="Typo-tolerant name search ranked by edit distance"),
+        max_distance: int = Query(None, ge=0, description="Maximum edit distance per word for fuzzy search"),
+        accept_encoding: str = Header(None)
 ):
     """
-    Ищет контакт по номеру телефона или имени.
+    Ищет контакт по номеру телефона, email или имени.
+    С exact=true имя должно совпасть целиком (без учёта регистра), с fuzzy=true
+    имя ищется с опечатками (не больше FUZZY_MAX_DISTANCE правок на слово).
+    Результаты кэшируются по нормализованным параметрам до изменения книги.
     """
-    try:
-        if phone:
-            contact = contact_book.find_contact(phone)
-            if not contact:
-                raise ContactNotFoundError(f"Contact with phone {phone} not found.")
-            return contact
-        elif name:
-            results = [
-                contact for contact in contact_book.get_all_contacts().values()
-                if name.lower() in contact.name.lower()
-            ]
-            if not results:
-                raise ContactNotFoundError(f"No contacts found with name {name}.")
-            return results
-        else:
-            raise HTTPException(status_code=400, detail="Please provide a phone or name to search.")
-    except ContactNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
+    if phone:
+        key = ("phone", phone)
+        search = partial(repository.find_contact, phone)
+        not_found = f"Contact with phone {phone} not found."
+    elif email:
+        key = ("email", email)
+        search = partial(repository.find_by_email, email)
+        not_found = f"No contacts found with email {email}."
+    elif name and exact:
+        key = ("exact", normalize_name(name))
+        search = partial(repository.find_by_name, name)
+        not_found = f"No contacts found with name {name}."
+    elif name and fuzzy:
+        if max_distance is None or max_distance > FUZZY_MAX_DISTANCE:
+            max_distance = FUZZY_MAX_DISTANCE
+        key = ("fuzzy", tuple(fuzzy_words(name)), max_distance)
+        search = partial(repository.fuzzy_search_by_name, name, max_distance)
+        not_found = f"No contacts found with name {name}."
+    elif name:
+        key = ("name", name.lower())
+        search = partial(repository.search_by_name, name)
+        not_found = f"No contacts found with name {name}."
+    else:
+        raise HTTPException(status_code=400, detail="Please provide a phone, email or name to search.")
+
+    version = repository.version()
+    body = search_cache.get(key, version, NOT_CACHED) if use_cache() else NOT_CACHED
+    if body is NOT_CACHED:
+        body = await run_shared(("search", key, version), lambda: executor.run(run_search, search))
+        search_cache.put(key, version, body)
+    if body is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    return await json_response(body, accept_encoding)
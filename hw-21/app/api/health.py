@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Response
+from fastapi.responses import JSONResponse
+from app.api.contacts import executor, load_progress, loop_lag_monitor, repository, search_cache, single_flight
+from app.api.contacts import snapshot_scheduler
+from app.utils.metrics import CONTENT_TYPE, HTTPMetrics, render_histogram, render_metric, render_stats
+
+router = APIRouter()
+
+# Заполняется MetricsMiddleware, подключённым в main.py
+http_metrics = HTTPMetrics()
+
+
+@router.get("/live")
+async def live():
+    """
+    Проверка живости: процесс принимает запросы, даже пока книга загружается.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Проверка готовности: 200 после загрузки книги, до этого 503 с ходом загрузки.
+    """
+    if load_progress.ready:
+        return load_progress.stats()
+    headers = {} if load_progress.error else {"Retry-After": str(load_progress.retry_after())}
+    return JSONResponse(status_code=503, content=load_progress.stats(), headers=headers)
+
+
+def storage_metrics() -> list[str]:
+    """
+    Показатели хранилища. Для sqlite это запросы к базе, поэтому выполняется в пуле.
+    """
+    lines = render_stats("contact_book_storage", repository.stats(), "Contact storage")
+    lines += render_metric(
+        "contact_book_index_keys", "gauge", "Keys in each in-memory index.",
+        (({"index": name}, size) for name, size in repository.index_sizes().items()),
+    )
+    for name, histogram in repository.histograms().items():
+        lines += render_histogram(f"contact_book_storage_{name}", f"Contact storage: {name}.", [({}, histogram)])
+    return lines
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Метрики запросов и контактной книги в текстовом формате Prometheus.
+    """
+    lines = http_metrics.render()
+    lines += render_metric("contact_book_ready", "gauge", "1 when the contact book is loaded.", [({}, load_progress.ready)])
+    lines += render_stats("contact_book_load", load_progress.stats(), "Background load")
+    if load_progress.ready:
+        lines += await executor.run(storage_metrics)
+    lines += render_metric(
+        "contact_book_snapshots_total", "counter", "Background snapshots written.",
+        [({}, snapshot_scheduler.snapshots_total)],
+    )
+    lines += render_metric(
+        "contact_book_snapshot_failures_total", "counter", "Background snapshots that failed.",
+        [({}, snapshot_scheduler.failures_total)],
+    )
+    lines += render_histogram(
+        "contact_book_snapshot_duration_seconds", "Time to write a background snapshot.",
+        [({}, snapshot_scheduler.durations)],
+    )
+    lines += render_stats("contact_book_executor", {**executor.stats(), **loop_lag_monitor.stats()}, "Thread pool")
+    lines += render_stats("contact_book_search_cache", search_cache.stats(), "Search cache")
+    lines += render_stats("contact_book_single_flight", single_flight.stats(), "Coalesced requests")
+    return Response(content="\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -0,0 +1,39 @@
+import hmac
+import os
+from fastapi import APIRouter, Header, HTTPException, Path, Query
+from fastapi.responses import FileResponse
+from app.config import PROFILE_DIR, PROFILING_TOKEN
+
+router = APIRouter()
+
+
+def check_token(token: str | None) -> None:
+    """
+    Профили раскрывают пути и параметры чужих запросов, поэтому отдаются только
+    с CONTACT_BOOK_PROFILING_TOKEN; без настроенного токена они недоступны.
+    """
+    if not PROFILING_TOKEN:
+        raise HTTPException(status_code=403, detail="Set CONTACT_BOOK_PROFILING_TOKEN to download profiles.")
+    if token is None or not hmac.compare_digest(token.encode("utf-8"), PROFILING_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid profiling token.")
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+        profile_id: str = Path(pattern=r"^\d{8}-\d{6}-[0-9a-f]{8}$", description="Value of the X-Profile-Id header"),
+        format: str = Query("text", pattern="^(text|pstats)$", description="text summary or pstats file"),
+        token: str = Query(None, description="CONTACT_BOOK_PROFILING_TOKEN, if not sent as X-Profile-Token"),
+        x_profile_token: str = Header(None)
+):
+    """
+    Сводка профиля запроса или файл статистики для pstats.
+    Токен передаётся заголовком X-Profile-Token или параметром token.
+    """
+    check_token(x_profile_token or token)
+    extension = "txt" if format == "text" else "pstats"
+    filename = os.path.join(PROFILE_DIR, f"{profile_id}.{extension}")
+    if not os.path.exists(filename):
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+    if format == "text":
+        return FileResponse(filename, media_type="text/plain; charset=utf-8")
+    return FileResponse(filename, media_type="application/octet-stream", filename=f"{profile_id}.pstats")
@@ -0,0 +1,75 @@
+import os
+
+# Файл со снимком (snapshot) контактной книги
+FILE_NAME = os.getenv("CONTACT_BOOK_FILE", "contact_book.json")
+
+# Журнал изменений (write-ahead log), который дописывается при каждой операции
+WAL_FILE_NAME = os.getenv("CONTACT_BOOK_WAL_FILE", "contact_book.wal")
+
+# Размер журнала в байтах, после которого он сворачивается в новый снимок
+WAL_COMPACT_THRESHOLD = int(os.getenv("CONTACT_BOOK_WAL_COMPACT_THRESHOLD", 4 * 1024 * 1024))
+
+# Вызывать fsync после каждой записи в журнал (надёжнее, но медленнее)
+WAL_FSYNC = os.getenv("CONTACT_BOOK_WAL_FSYNC", "0") == "1"
+
+# Количество рабочих процессов (uvicorn берёт из этой переменной значение --workers по умолчанию)
+WORKERS = int(os.getenv("WEB_CONCURRENCY", 1))
+
+# Хранилище контактов: "memory" (словарь в памяти + JSON и журнал) или "sqlite".
+# Несколько процессов могут работать только с общей базой sqlite
+STORAGE_BACKEND = os.getenv("CONTACT_BOOK_STORAGE", "sqlite" if WORKERS > 1 else "memory")
+
+# Файл базы данных для хранилища sqlite
+SQLITE_FILE_NAME = os.getenv("CONTACT_BOOK_SQLITE_FILE", "contact_book.db")
+
+# Интервал фоновых снимков в секундах (0 - только при завершении работы)
+SNAPSHOT_INTERVAL = float(os.getenv("CONTACT_BOOK_SNAPSHOT_INTERVAL", 30))
+
+# Минимальное количество изменений, после которого делается фоновый снимок
+SNAPSHOT_DIRTY_THRESHOLD = int(os.getenv("CONTACT_BOOK_SNAPSHOT_DIRTY_THRESHOLD", 1000))
+
+# Максимальное расстояние Левенштейна для нечёткого поиска по имени (fuzzy=true)
+FUZZY_MAX_DISTANCE = int(os.getenv("CONTACT_BOOK_FUZZY_MAX_DISTANCE", 2))
+
+# Размер страницы GET /api/contacts/ по умолчанию и максимальный
+PAGE_SIZE = int(os.getenv("CONTACT_BOOK_PAGE_SIZE", 50))
+MAX_PAGE_SIZE = int(os.getenv("CONTACT_BOOK_MAX_PAGE_SIZE", 1000))
+
+# Количество контактов в одном фрагменте потоковой выгрузки /api/contacts/export
+EXPORT_CHUNK_SIZE = int(os.getenv("CONTACT_BOOK_EXPORT_CHUNK_SIZE", 1000))
+
+# Количество запомненных результатов /api/contacts/search/ (0 - без кэша)
+SEARCH_CACHE_SIZE = int(os.getenv("CONTACT_BOOK_SEARCH_CACHE_SIZE", 1024))
+
+# Максимальное количество операций в одном запросе /api/contacts/batch
+MAX_BATCH_SIZE = int(os.getenv("CONTACT_BOOK_MAX_BATCH_SIZE", 100000))
+
+# Размер слоя изменений, после которого он сливается в новую базу в фоне (хранилище memory)
+MERGE_THRESHOLD = int(os.getenv("CONTACT_BOOK_MERGE_THRESHOLD", 1024))
+
+# Пул потоков для тяжёлых операций: размер, длина очереди и таймаут в секундах (0 - без таймаута)
+EXECUTOR_WORKERS = int(os.getenv("CONTACT_BOOK_EXECUTOR_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+EXECUTOR_MAX_PENDING = int(os.getenv("CONTACT_BOOK_EXECUTOR_MAX_PENDING", 100))
+EXECUTOR_TIMEOUT = float(os.getenv("CONTACT_BOOK_EXECUTOR_TIMEOUT", 10))
+
+# Сколько секунд запрос к данным ждёт фоновую загрузку книги, прежде чем получить 503 (0 - не ждать)
+READY_WAIT_TIMEOUT = float(os.getenv("CONTACT_BOOK_READY_WAIT_TIMEOUT", 0))
+
+# Количество запомненных таблиц главной страницы (страница, порядок, размер) для текущей версии книги
+VIEW_CACHE_SIZE = int(os.getenv("CONTACT_BOOK_VIEW_CACHE_SIZE", 256))
+
+# Каталог кэша скомпилированных шаблонов Jinja2 (по умолчанию - временный каталог системы)
+TEMPLATE_CACHE_DIR = os.getenv("CONTACT_BOOK_TEMPLATE_CACHE_DIR") or None
+
+# Сжатие ответов gzip: уровень 1-9 (0 - без сжатия) и минимальный размер тела в байтах
+COMPRESSION_LEVEL = int(os.getenv("CONTACT_BOOK_COMPRESSION_LEVEL", 6))
+COMPRESSION_MIN_SIZE = int(os.getenv("CONTACT_BOOK_COMPRESSION_MIN_SIZE", 1024))
+
+# Профилирование отдельных запросов с заголовком X-Profile или параметром profile (1 - включено)
+PROFILING_ENABLED = os.getenv("CONTACT_BOOK_PROFILING", "0") == "1"
+# Значение X-Profile или profile, которое включает профилирование (пусто - любое, кроме 0 и false).
+# Он же нужен для загрузки профилей /profiles/{id}; без него профили не отдаются
+PROFILING_TOKEN = os.getenv("CONTACT_BOOK_PROFILING_TOKEN", "")
+# Каталог статистики профилей и количество функций в сводке
+PROFILE_DIR = os.getenv("CONTACT_BOOK_PROFILE_DIR", "profiles")
+PROFILE_TOP = int(os.getenv("CONTACT_BOOK_PROFILE_TOP", 30))
@@ -12,4 +12,28 @@ class ContactNotFoundError(ContactBookError):
 
 class ContactAlreadyExistsError(ContactBookError):
     """Exception raised when trying to add a contact that already exists."""
-    pass
\ No newline at end of file
+    pass
+
+class InvalidCursorError(ContactBookError):
+    """Exception raised when a pagination cursor cannot be decoded."""
+    pass
+
+class StorageLockedError(ContactBookError):
+    """Exception raised when the storage files are already used by another process."""
+    pass
+
+class ExecutorBusyError(ContactBookError):
+    """Exception raised when too many heavy operations are already queued."""
+    pass
+
+class ExecutorTimeoutError(ContactBookError):
+    """Exception raised when a heavy operation does not finish in time."""
+    pass
+
+class StorageBusyError(ContactBookError):
+    """Exception raised when the storage stays locked by another writer for too long."""
+    pass
+
+class StorageNotReadyError(ContactBookError):
+    """Exception raised when the contact book is still loading or failed to load."""
+    pass
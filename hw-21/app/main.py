@@ -1,11 +1,79 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from app.api.contacts import router as api_router
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from app.api.contacts import router as api_router, load_contacts, load_progress, save_contacts
+from app.api.health import router as health_router, http_metrics
+from app.api.profiles import router as profiles_router
 from app.views.views import router as views_router
+from app.exceptions import ExecutorBusyError, ExecutorTimeoutError, StorageBusyError, StorageNotReadyError
+from app.config import COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE
+from app.config import PROFILING_ENABLED, PROFILING_TOKEN, PROFILE_DIR, PROFILE_TOP
+from app.utils.metrics import MetricsMiddleware
+from app.utils.profiling import ProfilingMiddleware
 
-app = FastAPI()
 
-app.mount("/static", StaticFiles(directory="api/static"), name="static")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запуск фоновой загрузки контактов и сохранение при завершении работы.
+    Обработчики router.on_event подключённого роутера FastAPI вызывал дважды.
+    """
+    await load_contacts()
+    yield
+    await save_contacts()
 
+
+app = FastAPI(lifespan=lifespan)
+
+# Остальные ответы (страницы, поиск, HTML) сжимаются по Accept-Encoding;
+# уже сжатые (полный список, выгрузка, статические файлы) пропускаются
+if COMPRESSION_LEVEL > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE, compresslevel=COMPRESSION_LEVEL)
+
+# Профилирование включается только настройкой; без неё заголовок X-Profile игнорируется
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, directory=PROFILE_DIR, top=PROFILE_TOP, token=PROFILING_TOKEN)
+
+# Подключается последним, чтобы охватывать сжатие и учитывать размер ответа после него
+app.add_middleware(MetricsMiddleware, metrics=http_metrics)
+
+
+@app.exception_handler(ExecutorBusyError)
+async def executor_busy_handler(request: Request, exc: ExecutorBusyError):
+    """
+    Очередь тяжёлых операций заполнена: клиенту предлагается повторить запрос позже.
+    """
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(StorageBusyError)
+async def storage_busy_handler(request: Request, exc: StorageBusyError):
+    """
+    База занята записью другого процесса дольше таймаута ожидания.
+    """
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(ExecutorTimeoutError)
+async def executor_timeout_handler(request: Request, exc: ExecutorTimeoutError):
+    """
+    Тяжёлая операция не уложилась в CONTACT_BOOK_EXECUTOR_TIMEOUT.
+    """
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+@app.exception_handler(StorageNotReadyError)
+async def storage_not_ready_handler(request: Request, exc: StorageNotReadyError):
+    """
+    Книга ещё загружается: Retry-After оценивается по ходу загрузки.
+    """
+    headers = {} if load_progress.error else {"Retry-After": str(load_progress.retry_after())}
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers=headers)
+
+
+app.include_router(health_router)
+if PROFILING_ENABLED:
+    app.include_router(profiles_router)
 app.include_router(views_router)
 app.include_router(api_router, prefix="/api")
\ No newline at end of file
@@ -0,0 +1,40 @@
+from typing import Literal
+from pydantic import BaseModel, model_validator
+
+
+class BatchOperation(BaseModel):
+    """
+    Одна операция пакета: add требует name и email, в edit пустые поля не меняются.
+    """
+    op: Literal["add", "edit", "delete"]
+    phone: str
+    name: str | None = None
+    email: str | None = None
+
+    @model_validator(mode="after")
+    def check_fields(self) -> "BatchOperation":
+        if self.op == "add" and (self.name is None or self.email is None):
+            raise ValueError("Operation add requires name and email.")
+        return self
+
+
+class BatchResult(BaseModel):
+    """
+    Результат операции пакета: ok, error или rolled_back (отменена из-за ошибки
+    другой операции в режиме atomic), либо skipped (не выполнялась).
+    """
+    phone: str
+    status: Literal["ok", "error", "rolled_back", "skipped"]
+    detail: str | None = None
+
+
+def rollback_results(operations: list[BatchOperation], results: list[BatchResult]) -> list[BatchResult]:
+    """
+    Результаты отменённого пакета: выполненные операции отмечаются rolled_back,
+    невыполненные - skipped.
+    """
+    return [
+        *(BatchResult(phone=result.phone, status="rolled_back") if result.status == "ok" else result
+          for result in results),
+        *(BatchResult(phone=operation.phone, status="skipped") for operation in operations[len(results):]),
+    ]
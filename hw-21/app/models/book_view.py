@@ -0,0 +1,163 @@
+import heapq
+from typing import Callable, Iterable, Iterator
+from app.models.contact import SORT_KEYS, Contact, ContactBook, normalize_name, phone_digits
+from app.utils.fuzzy import fuzzy_score, fuzzy_words
+
+
+class ContactBookView:
+    """
+    Неизменяемое состояние контактной книги: базовая ContactBook с индексами
+    и небольшой слой изменений поверх неё ({телефон: контакт или None, если удалён}).
+
+    После публикации ни база, ни слой изменений не меняются, поэтому читатели
+    работают без блокировок и всегда видят согласованное состояние одной версии.
+    Запись создаёт новое представление с копией слоя изменений (O(размер слоя)),
+    а когда слой разрастается, он сливается в новую базу (merged). Размер слоя
+    ограничен, поэтому чтения, учитывающие слой, стоят не больше константы
+    сверх запроса к базе.
+    """
+
+    def __init__(
+            self,
+            base: ContactBook,
+            changes: dict[str, Contact | None] | None = None,
+            version: int | None = None,
+            count: int | None = None
+    ):
+        self.base = base
+        self.changes = changes or {}
+        self.version = base.version if version is None else version
+        self.count = len(base.contacts) if count is None else count
+
+    def with_changes(self, changes: dict[str, Contact | None]) -> "ContactBookView":
+        """
+        Новое представление с применёнными изменениями и следующей версией.
+        """
+        count = self.count
+        for phone, contact in changes.items():
+            count += (contact is not None) - (self.find_contact(phone) is not None)
+        return ContactBookView(self.base, {**self.changes, **changes}, self.version + 1, count)
+
+    def merged(self) -> ContactBook:
+        """
+        Новая база со всеми изменениями слоя: копия текущей базы, в индексах
+        которой обновлены только изменённые контакты. Если слой сравним
+        с базой, индексы дешевле построить заново. Текущая база не меняется.
+        """
+        if len(self.changes) * 4 >= len(self.base.contacts):
+            contact_book = ContactBook()
+            contact_book.load(self.iter_contacts())
+            return contact_book
+        contact_book = self.base.copy()
+        contact_book.apply_changes(self.changes)
+        return contact_book
+
+    def rebase(self, base: ContactBook, merged_from: "ContactBookView") -> "ContactBookView":
+        """
+        Перенос на новую базу, построенную из merged_from: в слое остаются только
+        изменения, сделанные после merged_from.
+        """
+        changes = {
+            phone: contact for phone, contact in self.changes.items()
+            if merged_from.changes.get(phone, ...) is not contact
+        }
+        return ContactBookView(base, changes, self.version, self.count)
+
+    def _base_contacts(self, contacts: Iterable[Contact]) -> list[Contact]:
+        # Контакты базы, которые не изменены и не удалены в слое изменений
+        return [contact for contact in contacts if contact.phone not in self.changes]
+
+    def _changed_contacts(self, predicate: Callable[[Contact], bool]) -> list[Contact]:
+        return [contact for contact in self.changes.values() if contact is not None and predicate(contact)]
+
+    def find_contact(self, phone: str) -> Contact | None:
+        if phone in self.changes:
+            return self.changes[phone]
+        return self.base.find_contact(phone)
+
+    def find_by_email(self, email: str) -> list[Contact]:
+        return self._base_contacts(self.base.find_by_email(email)) + self._changed_contacts(
+            lambda contact: contact.email == email
+        )
+
+    def find_by_name(self, name: str) -> list[Contact]:
+        name = normalize_name(name)
+        changed = sorted(
+            self._changed_contacts(lambda contact: normalize_name(contact.name) == name),
+            key=lambda contact: contact.phone,
+        )
+        return list(heapq.merge(
+            self._base_contacts(self.base.find_by_name(name)), changed, key=lambda contact: contact.phone
+        ))
+
+    def search_by_name(self, name: str) -> list[Contact]:
+        # База возвращает результаты по возрастанию телефона; изменённые контакты
+        # вливаются в них в том же порядке
+        lowered = name.lower()
+        changed = sorted(
+            self._changed_contacts(lambda contact: lowered in contact.name.lower()),
+            key=lambda contact: contact.phone,
+        )
+        return list(heapq.merge(
+            self._base_contacts(self.base.search_by_name(name)), changed, key=lambda contact: contact.phone
+        ))
+
+    def fuzzy_search_by_name(self, name: str, max_distance: int) -> list[Contact]:
+        contacts = self._base_contacts(self.base.fuzzy_search_by_name(name, max_distance))
+        if not self.changes:
+            return contacts
+        query_words = fuzzy_words(name)
+        scored = [
+            (fuzzy_score(query_words, fuzzy_words(contact.name), max_distance), normalize_name(contact.name),
+             contact.phone, contact)
+            for contact in contacts + self._changed_contacts(lambda contact: True)
+        ]
+        scored = sorted((item for item in scored if item[0] is not None), key=lambda item: item[:3])
+        return [item[3] for item in scored]
+
+    def _first(
+            self,
+            base_contacts: list[Contact],
+            predicate: Callable[[Contact], bool],
+            key: Callable[[Contact], str],
+            limit: int
+    ) -> list[Contact]:
+        # База возвращает limit + len(changes) записей, чтобы после отбрасывания
+        # изменённых контактов их осталось не меньше limit
+        candidates = self._base_contacts(base_contacts) + self._changed_contacts(predicate)
+        return heapq.nsmallest(limit, candidates, key=lambda contact: (key(contact), contact.phone))
+
+    def suggest_by_name(self, prefix: str, limit: int) -> list[Contact]:
+        base_contacts = self.base.suggest_by_name(prefix, limit + len(self.changes))
+        prefix = normalize_name(prefix)
+        return self._first(
+            base_contacts, lambda contact: normalize_name(contact.name).startswith(prefix), SORT_KEYS["name"], limit
+        )
+
+    def suggest_by_phone(self, prefix: str, limit: int) -> list[Contact]:
+        base_contacts = self.base.suggest_by_phone(prefix, limit + len(self.changes))
+        prefix = phone_digits(prefix)
+        return self._first(
+            base_contacts,
+            lambda contact: phone_digits(contact.phone).startswith(prefix),
+            lambda contact: phone_digits(contact.phone),
+            limit,
+        )
+
+    def get_page(self, order: str, after: tuple[str, str] | None, limit: int) -> list[Contact]:
+        base_contacts = self.base.get_page(order, after, limit + len(self.changes))
+        key = SORT_KEYS[order]
+        return self._first(
+            base_contacts, lambda contact: after is None or (key(contact), contact.phone) > after, key, limit
+        )
+
+    def iter_contacts(self) -> Iterator[Contact]:
+        """
+        Обход всех контактов этой версии без копирования: база и слой не меняются.
+        """
+        for phone, contact in self.base.contacts.items():
+            if phone not in self.changes:
+                yield contact
+        for contact in self.changes.values():
+            if contact is not None:
+                yield contact
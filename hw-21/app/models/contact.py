@@ -1,4 +1,8 @@
+import time
 from pydantic import BaseModel
+from typing import Iterable, Iterator
+from app.models.indexes import BKTreeIndex, FieldIndex, SortedIndex, TrigramIndex
+from app.utils.fuzzy import fuzzy_words
 from app.exceptions import ContactAlreadyExistsError, ContactNotFoundError
 
 class Contact(BaseModel):
@@ -6,29 +10,213 @@ class Contact(BaseModel):
     phone: str
     email: str
 
+
+def normalize_name(name: str) -> str:
+    return name.casefold()
+
+
+def phone_digits(phone: str) -> str:
+    return "".join(char for char in phone if char.isdigit())
+
+
+# Ключи сортировки для постраничного вывода
+SORT_KEYS = {
+    "phone": lambda contact: contact.phone,
+    "name": lambda contact: normalize_name(contact.name),
+}
+
+
 class ContactBook:
     def __init__(self):
         self.contacts = {}
+        # Номер версии, который увеличивается при каждом изменении книги.
+        # Начинается с текущего времени, чтобы версии (и ETag) не повторялись после перезапуска
+        self.version = time.time_ns()
+        self.email_index = FieldIndex(lambda contact: contact.email)
+        self.name_index = FieldIndex(lambda contact: normalize_name(contact.name))
+        self.name_trigram_index = TrigramIndex(lambda contact: contact.name.lower())
+        self.name_prefix_index = SortedIndex(SORT_KEYS["name"])
+        self.phone_prefix_index = SortedIndex(lambda contact: phone_digits(contact.phone))
+        self.phone_order_index = SortedIndex(SORT_KEYS["phone"])
+        self.name_fuzzy_index = BKTreeIndex(lambda contact: fuzzy_words(contact.name))
+        self._link_indexes()
+
+    def _link_indexes(self) -> None:
+        self.order_indexes = {"phone": self.phone_order_index, "name": self.name_prefix_index}
+        self.indexes = [
+            self.email_index,
+            self.name_index,
+            self.name_trigram_index,
+            self.name_prefix_index,
+            self.phone_prefix_index,
+            self.phone_order_index,
+            self.name_fuzzy_index,
+        ]
+
+    def copy(self) -> "ContactBook":
+        """
+        Копия книги для изменения, пока оригинал читают другие потоки.
+        Копируются только словари и массивы ссылок; контакты и неизменённые
+        множества индексов остаются общими, поэтому копия стоит намного
+        меньше полного перестроения индексов.
+        """
+        contact_book = ContactBook()
+        contact_book.contacts = dict(self.contacts)
+        contact_book.version = self.version
+        contact_book.email_index = self.email_index.copy()
+        contact_book.name_index = self.name_index.copy()
+        contact_book.name_trigram_index = self.name_trigram_index.copy()
+        contact_book.name_prefix_index = self.name_prefix_index.copy()
+        contact_book.phone_prefix_index = self.phone_prefix_index.copy()
+        contact_book.phone_order_index = self.phone_order_index.copy()
+        contact_book.name_fuzzy_index = self.name_fuzzy_index.copy()
+        contact_book._link_indexes()
+        return contact_book
+
+    def apply_changes(self, changes: dict[str, Contact | None]) -> None:
+        """
+        Применение слоя изменений ({телефон: контакт или None, если удалён}):
+        индексы обновляются только для изменённых контактов.
+        """
+        removed = []
+        added = []
+        for phone, contact in changes.items():
+            previous = self.contacts.pop(phone, None)
+            if previous is not None:
+                removed.append(previous)
+            if contact is not None:
+                self.contacts[phone] = contact
+                added.append(contact)
+        for index in self.indexes:
+            index.update(removed, added)
+        self.version += 1
+
+    def index_sizes(self) -> dict[str, int]:
+        """
+        Количество ключей в каждом индексе.
+        """
+        return {
+            "email": len(self.email_index),
+            "name": len(self.name_index),
+            "name_trigram": len(self.name_trigram_index),
+            "name_prefix": len(self.name_prefix_index),
+            "phone_prefix": len(self.phone_prefix_index),
+            "phone_order": len(self.phone_order_index),
+            "name_fuzzy": len(self.name_fuzzy_index),
+        }
+
+    def _index(self, contact: Contact) -> None:
+        for index in self.indexes:
+            index.add(contact)
+
+    def _unindex(self, contact: Contact) -> None:
+        for index in self.indexes:
+            index.remove(contact)
 
     def add_contact(self, contact: Contact) -> None:
         if contact.phone in self.contacts:
             raise ContactAlreadyExistsError(f"Contact with phone {contact.phone} already exists.")
         self.contacts[contact.phone] = contact
+        self._index(contact)
+        self.version += 1
+
+    def load(self, contacts: Iterable[Contact]) -> None:
+        self.contacts.clear()
+        for contact in contacts:
+            self.contacts[contact.phone] = contact
+        for index in self.indexes:
+            index.rebuild(self.contacts.values())
+        self.version += 1
+
+    def put_contact(self, contact: Contact) -> None:
+        self.discard_contact(contact.phone)
+        self.contacts[contact.phone] = contact
+        self._index(contact)
+        self.version += 1
 
     def find_contact(self, phone: str) -> Contact | None:
         return self.contacts.get(phone)
 
+    def find_by_email(self, email: str) -> list[Contact]:
+        return [self.contacts[phone] for phone in self.email_index.lookup(email)]
+
+    def find_by_name(self, name: str) -> list[Contact]:
+        return [self.contacts[phone] for phone in sorted(self.name_index.lookup(normalize_name(name)))]
+
+    def search_by_name(self, name: str) -> list[Contact]:
+        name = name.lower()
+        phones = self.name_trigram_index.candidates(name)
+        if phones is None:
+            return sorted(
+                (contact for contact in self.contacts.values() if name in contact.name.lower()),
+                key=lambda contact: contact.phone,
+            )
+        contacts = (self.contacts[phone] for phone in sorted(phones))
+        return [contact for contact in contacts if name in contact.name.lower()]
+
+    def fuzzy_search_by_name(self, name: str, max_distance: int) -> list[Contact]:
+        scores = None
+        for word in fuzzy_words(name):
+            matches = self.name_fuzzy_index.search(word, max_distance)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {phone: scores[phone] + distance for phone, distance in matches.items() if phone in scores}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        ranked = sorted(
+            scores,
+            key=lambda phone: (scores[phone], normalize_name(self.contacts[phone].name), phone),
+        )
+        return [self.contacts[phone] for phone in ranked]
+
+    def suggest_by_name(self, prefix: str, limit: int) -> list[Contact]:
+        phones = self.name_prefix_index.prefix(normalize_name(prefix), limit)
+        return [self.contacts[phone] for phone in phones]
+
+    def suggest_by_phone(self, prefix: str, limit: int) -> list[Contact]:
+        phones = self.phone_prefix_index.prefix(phone_digits(prefix), limit)
+        return [self.contacts[phone] for phone in phones]
+
+    def get_page(self, order: str, after: tuple[str, str] | None, limit: int) -> list[Contact]:
+        phones = self.order_indexes[order].page(after, limit)
+        return [self.contacts[phone] for phone in phones]
+
     def edit_contact(self, phone: str, name: str, email: str) -> None:
         contact = self.find_contact(phone)
         if not contact:
             raise ContactNotFoundError(f"Contact with phone {phone} not found.")
-        contact.name = name
-        contact.email = email
-  
+        # Контакт заменяется новым объектом, а не изменяется на месте:
+        # уже выданные ссылки (например, при выгрузке) остаются согласованными
+        updated = Contact(name=name, phone=phone, email=email)
+        self._unindex(contact)
+        self.contacts[phone] = updated
+        self._index(updated)
+        self.version += 1
+
     def delete_contact(self, phone: str) -> None:
         if phone not in self.contacts:
             raise ContactNotFoundError(f"Contact with phone {phone} not found.")
-        del self.contacts[phone]
+        self._unindex(self.contacts.pop(phone))
+        self.version += 1
+
+    def discard_contact(self, phone: str) -> None:
+        contact = self.contacts.pop(phone, None)
+        if contact is not None:
+            self._unindex(contact)
+            self.version += 1
+
+    def clear(self) -> None:
+        self.contacts.clear()
+        for index in self.indexes:
+            index.clear()
+        self.version += 1
+
+    def iter_contacts(self) -> Iterator[Contact]:
+        # Список ссылок фиксирует состав книги на момент вызова, а сами контакты не изменяются
+        return iter(list(self.contacts.values()))
 
     def get_all_contacts(self) -> dict[str, Contact]:
         return self.contacts
\ No newline at end of file
@@ -0,0 +1,413 @@
+import bisect
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable
+from app.utils.fuzzy import levenshtein
+
+if TYPE_CHECKING:
+    from app.models.contact import Contact
+
+
+class DeltaSet:
+    """
+    Множество как общее (неизменяемое) базовое множество плюс свои добавления
+    и удаления: added не пересекается с base, removed входит в base.
+    Так копия индекса меняет большое множество за O(изменений), не копируя его.
+    """
+
+    __slots__ = ("base", "added", "removed")
+
+    def __init__(self, base: set[str], added: set[str] | None = None, removed: set[str] | None = None):
+        self.base = base
+        self.added = added or set()
+        self.removed = removed or set()
+
+    def copy(self) -> "DeltaSet":
+        return DeltaSet(self.base, set(self.added), set(self.removed))
+
+    def add(self, phone: str) -> None:
+        if phone in self.removed:
+            self.removed.discard(phone)
+        elif phone not in self.base:
+            self.added.add(phone)
+
+    def discard(self, phone: str) -> None:
+        if phone in self.added:
+            self.added.discard(phone)
+        elif phone in self.base:
+            self.removed.add(phone)
+
+    def intersection(self, other: set[str]) -> set[str]:
+        result = self.base.intersection(other)
+        result -= self.removed
+        result |= self.added.intersection(other)
+        return result
+
+    def __contains__(self, phone: str) -> bool:
+        return phone in self.added or (phone in self.base and phone not in self.removed)
+
+    def __iter__(self):
+        yield from self.base - self.removed if self.removed else self.base
+        yield from self.added
+
+    def __len__(self) -> int:
+        return len(self.base) - len(self.removed) + len(self.added)
+
+
+class Postings:
+    """
+    Словарь ключ -> множество телефонов, копия которого делит множества
+    с оригиналом (copy-on-write). Небольшое множество копируется при первом
+    изменении, большое оборачивается в DeltaSet. Так копия индекса стоит
+    O(число ключей) ссылок плюс O(изменений), а не полного перестроения,
+    и оригинал, который могут читать другие потоки, не меняется.
+    """
+
+    # Множества меньше этого размера при изменении в копии просто копируются
+    DELTA_MIN_SIZE = 256
+
+    def __init__(self):
+        self.entries: dict[str, set[str] | DeltaSet] = {}
+        # Ключи, множества которых принадлежат этому словарю; None - все
+        self.owned: set[str] | None = None
+
+    def copy(self) -> "Postings":
+        postings = Postings()
+        postings.entries = dict(self.entries)
+        postings.owned = set()
+        return postings
+
+    def _writable(self, key: str) -> set[str] | DeltaSet | None:
+        # Множество ключа, которое можно изменять, не затрагивая оригинал
+        phones = self.entries.get(key)
+        if phones is None or self.owned is None or key in self.owned:
+            return phones
+        if isinstance(phones, DeltaSet):
+            phones = phones.copy()
+        elif len(phones) >= self.DELTA_MIN_SIZE:
+            phones = DeltaSet(phones)
+        else:
+            phones = set(phones)
+        self.entries[key] = phones
+        self.owned.add(key)
+        return phones
+
+    def _compact(self, key: str, phones: set[str] | DeltaSet) -> None:
+        if not phones:
+            del self.entries[key]
+        elif isinstance(phones, DeltaSet) and (len(phones.added) + len(phones.removed)) * 4 > len(phones.base):
+            # Изменений стало много: множество дешевле собрать заново
+            self.entries[key] = set(phones)
+
+    def add(self, key: str, phone: str) -> None:
+        phones = self._writable(key)
+        if phones is None:
+            phones = self.entries[key] = set()
+            if self.owned is not None:
+                self.owned.add(key)
+        phones.add(phone)
+        self._compact(key, phones)
+
+    def discard(self, key: str, phone: str) -> None:
+        phones = self._writable(key)
+        if phones is not None:
+            phones.discard(phone)
+            self._compact(key, phones)
+
+    def get(self, key: str) -> set[str] | DeltaSet | None:
+        return self.entries.get(key)
+
+    def clear(self) -> None:
+        self.entries = {}
+        self.owned = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class FieldIndex:
+    """
+    Вторичный индекс: значение поля (после нормализации) -> множество телефонов.
+    """
+
+    def __init__(self, key: Callable[["Contact"], str]):
+        self.key = key
+        self.postings = Postings()
+
+    def copy(self) -> "FieldIndex":
+        index = FieldIndex(self.key)
+        index.postings = self.postings.copy()
+        return index
+
+    def add(self, contact: "Contact") -> None:
+        self.postings.add(self.key(contact), contact.phone)
+
+    def remove(self, contact: "Contact") -> None:
+        self.postings.discard(self.key(contact), contact.phone)
+
+    def update(self, removed: list["Contact"], added: list["Contact"]) -> None:
+        for contact in removed:
+            self.remove(contact)
+        for contact in added:
+            self.add(contact)
+
+    def clear(self) -> None:
+        self.postings.clear()
+
+    def rebuild(self, contacts: Iterable["Contact"]) -> None:
+        self.clear()
+        for contact in contacts:
+            self.add(contact)
+
+    def lookup(self, value: str) -> set[str] | DeltaSet:
+        return self.postings.get(value) or set()
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Инвертированный индекс по триграммам: триграмма -> множество телефонов.
+
+    Кандидаты для поиска подстроки - пересечение списков всех триграмм
+    запроса; их нужно проверить, так как триграммы могут стоять не подряд.
+    """
+
+    def __init__(self, key: Callable[["Contact"], str]):
+        self.key = key
+        self.postings = Postings()
+
+    def copy(self) -> "TrigramIndex":
+        index = TrigramIndex(self.key)
+        index.postings = self.postings.copy()
+        return index
+
+    def add(self, contact: "Contact") -> None:
+        for trigram in trigrams(self.key(contact)):
+            self.postings.add(trigram, contact.phone)
+
+    def remove(self, contact: "Contact") -> None:
+        for trigram in trigrams(self.key(contact)):
+            self.postings.discard(trigram, contact.phone)
+
+    def update(self, removed: list["Contact"], added: list["Contact"]) -> None:
+        for contact in removed:
+            self.remove(contact)
+        for contact in added:
+            self.add(contact)
+
+    def clear(self) -> None:
+        self.postings.clear()
+
+    def rebuild(self, contacts: Iterable["Contact"]) -> None:
+        self.clear()
+        for contact in contacts:
+            self.add(contact)
+
+    def candidates(self, query: str) -> set[str] | None:
+        """
+        Телефоны, имена которых содержат все триграммы запроса,
+        или None, если запрос короче трёх символов и индекс не применим.
+        """
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return None
+        postings = sorted((self.postings.get(trigram) or set() for trigram in query_trigrams), key=len)
+        result = set(postings[0])
+        for phones in postings[1:]:
+            if not result:
+                break
+            result = phones.intersection(result)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+
+class SortedIndex:
+    """
+    Отсортированный массив пар (ключ, телефон) для поиска по префиксу.
+
+    Поиск - двоичный (bisect) и занимает O(log N + K) для K результатов.
+    При начальной загрузке массив строится одной сортировкой.
+    """
+
+    # Начиная с этого числа изменений update пересобирает массив целиком:
+    # фильтр и сортировка почти упорядоченного массива (O(N) в C) дешевле,
+    # чем столько сдвигов массива при insort
+    BULK_UPDATE_SIZE = 64
+
+    def __init__(self, key: Callable[["Contact"], str]):
+        self.key = key
+        self.entries: list[tuple[str, str]] = []
+
+    def copy(self) -> "SortedIndex":
+        index = SortedIndex(self.key)
+        index.entries = list(self.entries)
+        return index
+
+    def add(self, contact: "Contact") -> None:
+        bisect.insort(self.entries, (self.key(contact), contact.phone))
+
+    def remove(self, contact: "Contact") -> None:
+        entry = (self.key(contact), contact.phone)
+        position = bisect.bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+
+    def update(self, removed: list["Contact"], added: list["Contact"]) -> None:
+        if len(removed) + len(added) < self.BULK_UPDATE_SIZE:
+            for contact in removed:
+                self.remove(contact)
+            for contact in added:
+                self.add(contact)
+            return
+        removed_entries = {(self.key(contact), contact.phone) for contact in removed}
+        entries = [entry for entry in self.entries if entry not in removed_entries]
+        entries.extend((self.key(contact), contact.phone) for contact in added)
+        entries.sort()
+        self.entries = entries
+
+    def clear(self) -> None:
+        self.entries = []
+
+    def rebuild(self, contacts: Iterable["Contact"]) -> None:
+        self.entries = sorted((self.key(contact), contact.phone) for contact in contacts)
+
+    def prefix(self, prefix: str, limit: int) -> list[str]:
+        """
+        Телефоны первых limit записей, ключ которых начинается с prefix.
+        """
+        phones = []
+        position = bisect.bisect_left(self.entries, (prefix,))
+        while position < len(self.entries) and len(phones) < limit:
+            key, phone = self.entries[position]
+            if not key.startswith(prefix):
+                break
+            phones.append(phone)
+            position += 1
+        return phones
+
+    def page(self, after: tuple[str, str] | None, limit: int) -> list[str]:
+        """
+        Телефоны первых limit записей строго после ключа after (или с начала).
+        Позиция находится двоичным поиском, поэтому страница не зависит от номера.
+        """
+        position = bisect.bisect_right(self.entries, after) if after is not None else 0
+        return [phone for _, phone in self.entries[position:position + limit]]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class BKNode:
+    __slots__ = ("word", "children")
+
+    def __init__(self, word: str):
+        self.word = word
+        self.children: dict[int, "BKNode"] = {}
+
+
+class BKTreeIndex:
+    """
+    BK-дерево по словам имени с метрикой Левенштейна.
+
+    Для поиска с расстоянием не больше d обходятся только поддеревья, рёбра
+    которых отличаются от расстояния до узла не больше чем на d, поэтому
+    запрос не сравнивается с каждым словом. Слова, у которых не осталось
+    контактов, остаются в дереве пустыми узлами и переиспользуются.
+    Узлы дополнительно доступны по слову через словарь, поэтому дерево
+    обходится только при появлении нового слова.
+
+    Телефоны слов хранятся отдельно от дерева, а само дерево только растёт,
+    поэтому копия индекса делит дерево с оригиналом: слово, добавленное
+    копией, в оригинале найдётся, но без телефонов. Слова в общее дерево
+    добавляются под общей блокировкой (копии могут изменяться в разных потоках).
+    """
+
+    def __init__(self, key: Callable[["Contact"], list[str]]):
+        self.key = key
+        # Корень - пустое слово, которого нет у контактов: он создаётся сразу
+        # и не заменяется, поэтому копии всегда делят одно дерево
+        self.root = BKNode("")
+        self.nodes: dict[str, BKNode] = {}
+        self.postings = Postings()
+        self.tree_lock = threading.Lock()
+
+    def copy(self) -> "BKTreeIndex":
+        index = BKTreeIndex(self.key)
+        index.root = self.root
+        index.nodes = self.nodes
+        index.tree_lock = self.tree_lock
+        index.postings = self.postings.copy()
+        return index
+
+    def _insert(self, word: str) -> None:
+        with self.tree_lock:
+            if word in self.nodes:
+                return
+            new_node = BKNode(word)
+            node = self.root
+            while True:
+                distance = levenshtein(word, node.word)
+                child = node.children.get(distance)
+                if child is None:
+                    node.children[distance] = new_node
+                    break
+                node = child
+            self.nodes[word] = new_node
+
+    def add(self, contact: "Contact") -> None:
+        for word in set(self.key(contact)):
+            if word not in self.nodes:
+                self._insert(word)
+            self.postings.add(word, contact.phone)
+
+    def remove(self, contact: "Contact") -> None:
+        for word in set(self.key(contact)):
+            self.postings.discard(word, contact.phone)
+
+    def update(self, removed: list["Contact"], added: list["Contact"]) -> None:
+        for contact in removed:
+            self.remove(contact)
+        for contact in added:
+            self.add(contact)
+
+    def clear(self) -> None:
+        # Новое дерево, а не очистка общего: копии индекса продолжают работать со старым
+        self.root = BKNode("")
+        self.nodes = {}
+        self.postings.clear()
+        self.tree_lock = threading.Lock()
+
+    def rebuild(self, contacts: Iterable["Contact"]) -> None:
+        self.clear()
+        for contact in contacts:
+            self.add(contact)
+
+    def search(self, word: str, max_distance: int) -> dict[str, int]:
+        """
+        Телефоны контактов, в имени которых есть слово на расстоянии
+        не больше max_distance от word, с наименьшим таким расстоянием.
+        """
+        result: dict[str, int] = {}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = levenshtein(word, node.word)
+            if distance <= max_distance:
+                for phone in self.postings.get(node.word) or ():
+                    if distance < result.get(phone, max_distance + 1):
+                        result[phone] = distance
+            # Копия списка: дерево может расти в другом потоке (общее с копией индекса)
+            for edge, child in list(node.children.items()):
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.postings)
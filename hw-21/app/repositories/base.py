@@ -0,0 +1,207 @@
+from abc import ABC, abstractmethod
+import heapq
+from typing import Iterator
+from app.models.batch import BatchOperation, BatchResult
+from app.models.contact import SORT_KEYS, Contact, normalize_name, phone_digits
+from app.utils.fuzzy import fuzzy_score, fuzzy_words
+from app.utils.metrics import Histogram
+from app.utils.progress import LoadProgress
+
+
+class ContactRepository(ABC):
+    """
+    Интерфейс хранилища контактов, через который работают маршруты API.
+    """
+
+    def acquire(self) -> None:
+        """
+        Быстрая проверка доступа к хранилищу до фоновой загрузки (open).
+        """
+
+    def open(self, progress: LoadProgress | None = None) -> None:
+        """
+        Подготовка хранилища при запуске приложения. Может быть долгой,
+        поэтому выполняется в фоне; ход отмечается в progress.
+        """
+
+    def close(self) -> None:
+        """
+        Сохранение данных и освобождение ресурсов при завершении работы.
+        """
+
+    def needs_snapshot(self, dirty_threshold: int) -> bool:
+        """
+        Нужен ли фоновый снимок: накоплено не меньше dirty_threshold изменений.
+        """
+        return False
+
+    def begin_snapshot(self) -> dict[str, list[str]] | None:
+        """
+        Неизменяемая копия данных на текущий момент для фонового снимка
+        или None, если хранилищу снимки не нужны.
+        """
+        return None
+
+    def write_snapshot(self, data: dict[str, list[str]]) -> None:
+        """
+        Запись копии данных на диск. Вызывается в рабочем потоке.
+        """
+
+    def finish_snapshot(self) -> None:
+        """
+        Завершение снимка после успешной записи.
+        """
+
+    @abstractmethod
+    def add_contact(self, contact: Contact) -> None:
+        """
+        Добавление контакта. ContactAlreadyExistsError, если телефон уже занят.
+        """
+
+    @abstractmethod
+    def find_contact(self, phone: str) -> Contact | None:
+        """
+        Поиск контакта по номеру телефона.
+        """
+
+    @abstractmethod
+    def edit_contact(self, phone: str, name: str, email: str) -> None:
+        """
+        Изменение контакта. ContactNotFoundError, если контакт не найден.
+        """
+
+    @abstractmethod
+    def delete_contact(self, phone: str) -> None:
+        """
+        Удаление контакта. ContactNotFoundError, если контакт не найден.
+        """
+
+    @abstractmethod
+    def apply_batch(self, operations: list[BatchOperation], atomic: bool) -> list[BatchResult]:
+        """
+        Применение пакета операций как одной единицы записи.
+        В режиме atomic при первой ошибке все изменения пакета отменяются,
+        иначе ошибочные операции пропускаются, а остальные сохраняются.
+        """
+
+    @abstractmethod
+    def get_all_contacts(self) -> dict[str, Contact]:
+        """
+        Все контакты в виде словаря {телефон: контакт}.
+        """
+
+    def iter_contacts(self) -> Iterator[Contact]:
+        """
+        Все контакты в согласованном состоянии на момент вызова, по одному.
+        Изменения во время обхода в выдачу не попадают.
+        """
+        return iter(list(self.get_all_contacts().values()))
+
+    @abstractmethod
+    def version(self) -> int:
+        """
+        Версия данных: увеличивается при каждом изменении контактов.
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Количество контактов.
+        """
+
+    def stats(self) -> dict:
+        """
+        Показатели хранилища для /metrics.
+        """
+        return {"contacts": self.count()}
+
+    def histograms(self) -> dict[str, Histogram]:
+        """
+        Гистограммы длительности операций хранилища (например, записи в журнал).
+        """
+        return {}
+
+    def index_sizes(self) -> dict[str, int]:
+        """
+        Количество ключей в индексах хранилища (если они есть).
+        """
+        return {}
+
+    def find_by_email(self, email: str) -> list[Contact]:
+        """
+        Контакты с точно совпадающим email.
+        """
+        return [contact for contact in self.get_all_contacts().values() if contact.email == email]
+
+    def find_by_name(self, name: str) -> list[Contact]:
+        """
+        Контакты с точно совпадающим именем (без учёта регистра).
+        """
+        name = normalize_name(name)
+        return [contact for contact in self.get_all_contacts().values() if normalize_name(contact.name) == name]
+
+    def fuzzy_search_by_name(self, name: str, max_distance: int) -> list[Contact]:
+        """
+        Нечёткий поиск по словам имени: каждое слово запроса должно быть не дальше
+        max_distance правок от какого-то слова имени. Результаты упорядочены
+        по сумме расстояний. Реализация по умолчанию перебирает все контакты.
+        """
+        query_words = fuzzy_words(name)
+        if not query_words:
+            return []
+        scored = []
+        for contact in self.get_all_contacts().values():
+            score = fuzzy_score(query_words, fuzzy_words(contact.name), max_distance)
+            if score is not None:
+                scored.append((score, normalize_name(contact.name), contact.phone, contact))
+        scored.sort(key=lambda item: item[:3])
+        return [item[3] for item in scored]
+
+    def suggest_by_name(self, prefix: str, limit: int) -> list[Contact]:
+        """
+        Первые limit контактов (по нормализованному имени), имя которых начинается с prefix.
+        """
+        prefix = normalize_name(prefix)
+        matches = (
+            (normalize_name(contact.name), contact.phone, contact)
+            for contact in self.get_all_contacts().values()
+            if normalize_name(contact.name).startswith(prefix)
+        )
+        return [match[2] for match in heapq.nsmallest(limit, matches, key=lambda match: match[:2])]
+
+    def suggest_by_phone(self, prefix: str, limit: int) -> list[Contact]:
+        """
+        Первые limit контактов (по цифрам телефона), телефон которых начинается с prefix.
+        Сравниваются только цифры, поэтому "+7 912" и "7912" эквивалентны.
+        """
+        prefix = phone_digits(prefix)
+        matches = (
+            (phone_digits(contact.phone), contact.phone, contact)
+            for contact in self.get_all_contacts().values()
+            if phone_digits(contact.phone).startswith(prefix)
+        )
+        return [match[2] for match in heapq.nsmallest(limit, matches, key=lambda match: match[:2])]
+
+    def get_page(self, order: str, after: tuple[str, str] | None, limit: int) -> list[Contact]:
+        """
+        Страница контактов в порядке (ключ сортировки order, телефон), начиная строго
+        после ключа after. Реализация по умолчанию сортирует все контакты.
+        """
+        sort_key = SORT_KEYS[order]
+        entries = (
+            ((sort_key(contact), contact.phone), contact)
+            for contact in self.get_all_contacts().values()
+        )
+        if after is not None:
+            entries = (entry for entry in entries if entry[0] > after)
+        return [entry[1] for entry in heapq.nsmallest(limit, entries, key=lambda entry: entry[0])]
+
+    def search_by_name(self, name: str) -> list[Contact]:
+        """
+        Поиск контактов, имя которых содержит строку (без учёта регистра).
+        """
+        name = name.lower()
+        return [
+            contact for contact in self.get_all_contacts().values()
+            if name in contact.name.lower()
+        ]
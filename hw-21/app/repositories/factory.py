@@ -0,0 +1,21 @@
+from app.repositories.base import ContactRepository
+from app.repositories.memory import MemoryContactRepository
+from app.repositories.sqlite import SQLiteContactRepository
+from app import config
+
+
+def create_repository(backend: str = config.STORAGE_BACKEND) -> ContactRepository:
+    """
+    Создание хранилища контактов по настройке CONTACT_BOOK_STORAGE.
+    """
+    if backend == "memory":
+        return MemoryContactRepository(
+            config.FILE_NAME,
+            config.WAL_FILE_NAME,
+            config.WAL_COMPACT_THRESHOLD,
+            fsync=config.WAL_FSYNC,
+            merge_threshold=config.MERGE_THRESHOLD,
+        )
+    if backend == "sqlite":
+        return SQLiteContactRepository(config.SQLITE_FILE_NAME, import_filename=config.FILE_NAME)
+    raise ValueError(f"Unknown storage backend {backend}.")
@@ -0,0 +1,313 @@
+import logging
+import threading
+try:
+    import fcntl
+except ImportError:
+    # Windows: блокировка файлов недоступна, несколько процессов не проверяются
+    fcntl = None
+from typing import Iterable, Iterator
+from app.models.batch import BatchOperation, BatchResult, rollback_results
+from app.models.book_view import ContactBookView
+from app.models.contact import Contact, ContactBook
+from app.repositories.base import ContactRepository
+from app.utils.file_handler import FileHandler
+from app.utils.metrics import Histogram
+from app.utils.progress import LoadProgress
+from app.utils.wal import WriteAheadLog, OP_ADD, OP_EDIT, OP_DELETE
+from app.exceptions import ContactAlreadyExistsError, ContactBookError, ContactNotFoundError, StorageLockedError
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryContactRepository(ContactRepository):
+    """
+    Хранилище в памяти: ContactBook, снимок в JSON и журнал изменений.
+
+    Текущее состояние - неизменяемое ContactBookView. Читатели берут ссылку
+    на него без блокировок, а запись под write_lock строит новое представление
+    и публикует его одним присваиванием. Когда слой изменений превышает
+    merge_threshold, он сливается в новую базу в фоновом потоке; если слой
+    всё же дорос до MERGE_LIMIT_FACTOR * merge_threshold (большой пакет
+    или слияние не успевает за записью), запись сливает его сама.
+    """
+
+    MERGE_LIMIT_FACTOR = 4
+
+    def __init__(
+            self,
+            filename: str,
+            wal_filename: str,
+            compact_threshold: int,
+            fsync: bool = False,
+            merge_threshold: int = 1024
+    ):
+        self.filename = filename
+        self.compact_threshold = compact_threshold
+        self.merge_threshold = merge_threshold
+        self.view = ContactBookView(ContactBook())
+        self.file_handler = FileHandler()
+        self.wal = WriteAheadLog(wal_filename, fsync=fsync)
+        self.dirty = 0
+        # Изменения, попавшие в записываемый снимок
+        self._snapshot_dirty = 0
+        self.write_lock = threading.Lock()
+        self._merge_thread = None
+        self._lock_file = None
+
+    def acquire(self) -> None:
+        """
+        Блокировка файлов хранилища, чтобы второй процесс не работал со своей копией.
+        """
+        self._acquire_lock()
+
+    def open(self, progress: LoadProgress | None = None) -> None:
+        """
+        Загрузка снимка и применение журнала изменений поверх него.
+        """
+        progress = progress or LoadProgress()
+        self._acquire_lock()
+        progress.set_phase("snapshot")
+        contact_book = ContactBook()
+        contact_book.load(self._then_indexes(
+            self.file_handler.iter_contacts(self.filename, progress=progress), progress
+        ))
+        progress.set_phase("log")
+        applied = self.wal.replay(contact_book)
+        self.view = ContactBookView(contact_book)
+        self.wal.open()
+        logger.info(f"{applied} changes replayed from log.")
+
+    @staticmethod
+    def _then_indexes(contacts: Iterable[Contact], progress: LoadProgress) -> Iterator[Contact]:
+        # ContactBook.load строит индексы после того, как контакты прочитаны
+        yield from contacts
+        progress.set_phase("indexes")
+
+    def close(self) -> None:
+        """
+        Сворачивание журнала в снимок при завершении работы.
+        """
+        self.compact()
+        self.wal.close()
+        merge_thread = self._merge_thread
+        if merge_thread is not None:
+            merge_thread.join()
+        self._release_lock()
+
+    def _acquire_lock(self) -> None:
+        if fcntl is None or self._lock_file is not None:
+            return
+        lock_file = open(f"{self.filename}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise StorageLockedError(
+                f"{self.filename} is used by another process. "
+                "Use CONTACT_BOOK_STORAGE=sqlite to run several workers."
+            )
+        self._lock_file = lock_file
+
+    def _release_lock(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def compact(self) -> None:
+        """
+        Синхронное сворачивание журнала изменений в новый снимок.
+        """
+        self.write_snapshot(self.begin_snapshot())
+        self.finish_snapshot()
+        logger.info("Write-ahead log compacted into snapshot.")
+
+    def needs_snapshot(self, dirty_threshold: int) -> bool:
+        """
+        Снимок нужен, если накопилось dirty_threshold изменений
+        или журнал превысил порог сворачивания.
+        """
+        if self.dirty == 0:
+            return False
+        return self.dirty >= dirty_threshold or self.wal.size() >= self.compact_threshold
+
+    def begin_snapshot(self) -> dict[str, list[str]]:
+        """
+        Копия данных на текущий момент; журнал ротируется, чтобы изменения,
+        сделанные во время записи снимка, остались в новом журнале.
+        Счётчик изменений уменьшается только после успешной записи (finish_snapshot),
+        поэтому неудачный снимок будет повторён.
+        """
+        with self.write_lock:
+            self.wal.rotate()
+            self._snapshot_dirty = self.dirty
+            view = self.view
+        return {contact.phone: [contact.name, contact.email] for contact in view.iter_contacts()}
+
+    def write_snapshot(self, data: dict[str, list[str]]) -> None:
+        self.file_handler.save_contacts_data(self.filename, data)
+
+    def finish_snapshot(self) -> None:
+        with self.write_lock:
+            self.dirty -= self._snapshot_dirty
+            self._snapshot_dirty = 0
+        self.wal.discard_rotated()
+
+    def log_change(self, op: str, phone: str, name: str | None = None, email: str | None = None) -> None:
+        """
+        Запись изменения в журнал.
+        """
+        self.wal.append(op, phone, name, email)
+        self.dirty += 1
+
+    def _publish(self, changes: dict[str, Contact | None]) -> None:
+        """
+        Публикация нового представления. Вызывается под write_lock.
+        """
+        view = self.view.with_changes(changes)
+        if len(view.changes) >= self.MERGE_LIMIT_FACTOR * self.merge_threshold:
+            view = ContactBookView(view.merged(), None, view.version, view.count)
+        self.view = view
+        if len(self.view.changes) >= self.merge_threshold and self._merge_thread is None:
+            self._merge_thread = threading.Thread(target=self._merge, args=(self.view,), daemon=True)
+            self._merge_thread.start()
+
+    def _merge(self, view: ContactBookView) -> None:
+        """
+        Слияние слоя изменений в новую базу. Построение идёт без блокировки,
+        а изменения, сделанные за это время, переносятся на новую базу.
+        Если за это время запись уже слила слой сама, результат не нужен.
+        """
+        try:
+            base = view.merged()
+        except Exception as e:
+            logger.error(f"Error merging contact changes: {e}")
+            base = None
+        with self.write_lock:
+            if base is not None and self.view.base is view.base:
+                self.view = self.view.rebase(base, view)
+            self._merge_thread = None
+
+    def add_contact(self, contact: Contact) -> None:
+        with self.write_lock:
+            if self.view.find_contact(contact.phone) is not None:
+                raise ContactAlreadyExistsError(f"Contact with phone {contact.phone} already exists.")
+            self.log_change(OP_ADD, contact.phone, contact.name, contact.email)
+            self._publish({contact.phone: contact})
+
+    def find_contact(self, phone: str) -> Contact | None:
+        return self.view.find_contact(phone)
+
+    def edit_contact(self, phone: str, name: str, email: str) -> None:
+        with self.write_lock:
+            if self.view.find_contact(phone) is None:
+                raise ContactNotFoundError(f"Contact with phone {phone} not found.")
+            self.log_change(OP_EDIT, phone, name, email)
+            self._publish({phone: Contact(name=name, phone=phone, email=email)})
+
+    def delete_contact(self, phone: str) -> None:
+        with self.write_lock:
+            if self.view.find_contact(phone) is None:
+                raise ContactNotFoundError(f"Contact with phone {phone} not found.")
+            self.log_change(OP_DELETE, phone)
+            self._publish({phone: None})
+
+    def apply_batch(self, operations: list[BatchOperation], atomic: bool) -> list[BatchResult]:
+        """
+        Пакет собирается в отдельный слой изменений, пишется в журнал одной записью
+        и публикуется одной версией. В режиме atomic при ошибке слой просто отбрасывается.
+        """
+        with self.write_lock:
+            changes = {}
+            results = []
+            records = []
+            for operation in operations:
+                previous = changes[operation.phone] if operation.phone in changes \
+                    else self.view.find_contact(operation.phone)
+                try:
+                    contact, record = self._apply_operation(operation, previous)
+                except ContactBookError as e:
+                    results.append(BatchResult(phone=operation.phone, status="error", detail=str(e)))
+                    if atomic:
+                        break
+                    continue
+                changes[operation.phone] = contact
+                records.append(record)
+                results.append(BatchResult(phone=operation.phone, status="ok"))
+
+            if atomic and any(result.status == "error" for result in results):
+                return rollback_results(operations, results)
+
+            if records:
+                self.wal.append_batch(records)
+                self.dirty += len(records)
+                self._publish(changes)
+            return results
+
+    @staticmethod
+    def _apply_operation(
+            operation: BatchOperation, previous: Contact | None
+    ) -> tuple[Contact | None, tuple[str, str, str | None, str | None]]:
+        if operation.op == OP_ADD:
+            if previous is not None:
+                raise ContactAlreadyExistsError(f"Contact with phone {operation.phone} already exists.")
+            contact = Contact(name=operation.name, phone=operation.phone, email=operation.email)
+            return contact, (OP_ADD, contact.phone, contact.name, contact.email)
+        if previous is None:
+            raise ContactNotFoundError(f"Contact with phone {operation.phone} not found.")
+        if operation.op == OP_EDIT:
+            contact = Contact(
+                name=operation.name or previous.name,
+                phone=operation.phone,
+                email=operation.email or previous.email,
+            )
+            return contact, (OP_EDIT, contact.phone, contact.name, contact.email)
+        return None, (OP_DELETE, operation.phone, None, None)
+
+    def find_by_email(self, email: str) -> list[Contact]:
+        return self.view.find_by_email(email)
+
+    def find_by_name(self, name: str) -> list[Contact]:
+        return self.view.find_by_name(name)
+
+    def search_by_name(self, name: str) -> list[Contact]:
+        return self.view.search_by_name(name)
+
+    def fuzzy_search_by_name(self, name: str, max_distance: int) -> list[Contact]:
+        return self.view.fuzzy_search_by_name(name, max_distance)
+
+    def suggest_by_name(self, prefix: str, limit: int) -> list[Contact]:
+        return self.view.suggest_by_name(prefix, limit)
+
+    def suggest_by_phone(self, prefix: str, limit: int) -> list[Contact]:
+        return self.view.suggest_by_phone(prefix, limit)
+
+    def get_page(self, order: str, after: tuple[str, str] | None, limit: int) -> list[Contact]:
+        return self.view.get_page(order, after, limit)
+
+    def get_all_contacts(self) -> dict[str, Contact]:
+        return {contact.phone: contact for contact in self.view.iter_contacts()}
+
+    def iter_contacts(self) -> Iterator[Contact]:
+        return self.view.iter_contacts()
+
+    def version(self) -> int:
+        return self.view.version
+
+    def count(self) -> int:
+        return self.view.count
+
+    def stats(self) -> dict:
+        view = self.view
+        return {
+            "contacts": view.count,
+            "changes_layer_size": len(view.changes),
+            "wal_bytes": self.wal.size(),
+            "wal_replay_seconds": self.wal.replay_seconds,
+            "dirty_changes": self.dirty,
+        }
+
+    def histograms(self) -> dict[str, Histogram]:
+        return {"wal_append_seconds": self.wal.append_seconds}
+
+    def index_sizes(self) -> dict[str, int]:
+        return self.view.base.index_sizes()
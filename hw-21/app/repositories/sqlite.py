@@ -0,0 +1,487 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+from app.models.batch import BatchOperation, BatchResult, rollback_results
+from app.models.contact import Contact, normalize_name, phone_digits
+from app.models.indexes import trigrams
+from app.repositories.base import ContactRepository
+from app.utils.file_handler import FileHandler
+from app.utils.fuzzy import fuzzy_score, fuzzy_words, levenshtein
+from app.utils.progress import LoadProgress
+from app.exceptions import ContactAlreadyExistsError, ContactBookError, ContactNotFoundError, StorageBusyError
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+# Инструкции схемы выполняются по одной внутри транзакции open().
+# name_folded и phone_digits - обычные столбцы, которые заполняет приложение
+# при записи: индексы по ним не зависят от функций Python, и базу можно
+# открывать любым клиентом SQLite.
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS contacts (
+        phone TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        name_folded TEXT NOT NULL,
+        phone_digits TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_contacts_email ON contacts (email)",
+    # Составной индекс в порядке сортировки страниц по имени: курсор (имя, телефон)
+    # находится поиском по индексу, а не перебором с начала
+    "CREATE INDEX IF NOT EXISTS idx_contacts_name_order ON contacts (name_folded, phone)",
+    "CREATE INDEX IF NOT EXISTS idx_contacts_phone_digits ON contacts (phone_digits)",
+    """
+    CREATE TABLE IF NOT EXISTS book_version (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        version INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_version_insert AFTER INSERT ON contacts
+    BEGIN UPDATE book_version SET version = version + 1; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_version_update AFTER UPDATE ON contacts
+    BEGIN UPDATE book_version SET version = version + 1; END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_version_delete AFTER DELETE ON contacts
+    BEGIN UPDATE book_version SET version = version + 1; END
+    """,
+    # Кандидаты поиска по имени: триграммы имён в нижнем регистре для поиска
+    # подстроки, слова имён (fuzzy_words), словарь слов по длине и триграммы слов
+    # словаря для нечёткого поиска. Записи добавляет приложение, удаляют триггеры
+    """
+    CREATE TABLE IF NOT EXISTS name_trigrams (
+        trigram TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        PRIMARY KEY (trigram, phone)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_name_trigrams_phone ON name_trigrams (phone)",
+    """
+    CREATE TABLE IF NOT EXISTS contact_words (
+        word TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        PRIMARY KEY (word, phone)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_contact_words_phone ON contact_words (phone)",
+    """
+    CREATE TABLE IF NOT EXISTS fuzzy_vocabulary (
+        length INTEGER NOT NULL,
+        word TEXT NOT NULL,
+        PRIMARY KEY (length, word)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS word_trigrams (
+        trigram TEXT NOT NULL,
+        word TEXT NOT NULL,
+        PRIMARY KEY (trigram, word)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_words_update AFTER UPDATE OF name ON contacts
+    WHEN old.name IS NOT new.name
+    BEGIN
+        DELETE FROM contact_words WHERE phone = old.phone;
+        DELETE FROM name_trigrams WHERE phone = old.phone;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_words_delete AFTER DELETE ON contacts
+    BEGIN
+        DELETE FROM contact_words WHERE phone = old.phone;
+        DELETE FROM name_trigrams WHERE phone = old.phone;
+    END
+    """,
+)
+
+# Запросы - постоянные строки с параметрами, поэтому sqlite3 подготавливает
+# их один раз и берёт из кэша соединения при повторных вызовах.
+SQL_INSERT = "INSERT INTO contacts (phone, name, email, name_folded, phone_digits) VALUES (?, ?, ?, ?, ?)"
+SQL_IMPORT = (
+    "INSERT OR REPLACE INTO contacts (phone, name, email, name_folded, phone_digits) VALUES (?, ?, ?, ?, ?)"
+)
+SQL_SELECT = "SELECT name, phone, email FROM contacts WHERE phone = ?"
+SQL_UPDATE = "UPDATE contacts SET name = ?, email = ?, name_folded = ? WHERE phone = ?"
+SQL_DELETE = "DELETE FROM contacts WHERE phone = ?"
+SQL_PATCH = (
+    "UPDATE contacts SET name = coalesce(?, name), email = coalesce(?, email), "
+    "name_folded = coalesce(?, name_folded) WHERE phone = ?"
+)
+SQL_SELECT_ALL = "SELECT name, phone, email FROM contacts"
+SQL_SELECT_ALL_ORDERED = "SELECT name, phone, email FROM contacts ORDER BY phone"
+SQL_VERSION = "SELECT version FROM book_version WHERE id = 0"
+# Версия начинается с текущего времени, как и в памяти: после пересоздания базы
+# старые ETag клиентов и кэши не совпадут с новой версией случайно
+SQL_SEED_VERSION = "INSERT OR IGNORE INTO book_version (id, version) VALUES (0, ?)"
+SQL_COUNT = "SELECT COUNT(*) FROM contacts"
+SQL_FIND_EMAIL = "SELECT name, phone, email FROM contacts WHERE email = ?"
+SQL_FIND_NAME = "SELECT name, phone, email FROM contacts WHERE name_folded = ? ORDER BY phone"
+SQL_SUGGEST_NAME = (
+    "SELECT name, phone, email FROM contacts WHERE name_folded >= ? AND name_folded < ? "
+    "ORDER BY name_folded, phone LIMIT ?"
+)
+SQL_SUGGEST_PHONE = (
+    "SELECT name, phone, email FROM contacts WHERE phone_digits >= ? AND phone_digits < ? "
+    "ORDER BY phone_digits, phone LIMIT ?"
+)
+SQL_PAGE = {
+    ("phone", False): "SELECT name, phone, email FROM contacts ORDER BY phone LIMIT ?",
+    ("phone", True): "SELECT name, phone, email FROM contacts WHERE phone > ? ORDER BY phone LIMIT ?",
+    ("name", False): "SELECT name, phone, email FROM contacts ORDER BY name_folded, phone LIMIT ?",
+    ("name", True): (
+        "SELECT name, phone, email FROM contacts WHERE (name_folded, phone) > (?, ?) "
+        "ORDER BY name_folded, phone LIMIT ?"
+    ),
+}
+SQL_SEARCH_NAME = "SELECT name, phone, email FROM contacts WHERE instr(py_lower(name), ?) > 0 ORDER BY phone"
+SQL_SELECT_NAMES = "SELECT phone, name FROM contacts"
+SQL_INSERT_WORD = "INSERT OR IGNORE INTO contact_words (word, phone) VALUES (?, ?)"
+SQL_INSERT_VOCABULARY = "INSERT OR IGNORE INTO fuzzy_vocabulary (length, word) VALUES (?, ?)"
+SQL_INSERT_TRIGRAM = "INSERT OR IGNORE INTO word_trigrams (trigram, word) VALUES (?, ?)"
+SQL_WORDS_BY_TRIGRAM = "SELECT word FROM word_trigrams WHERE trigram = ?"
+SQL_WORDS_BY_LENGTH = "SELECT word FROM fuzzy_vocabulary WHERE length BETWEEN ? AND ?"
+SQL_PHONES_BY_WORD = "SELECT phone FROM contact_words WHERE word = ?"
+SQL_INSERT_NAME_TRIGRAM = "INSERT OR IGNORE INTO name_trigrams (trigram, phone) VALUES (?, ?)"
+SQL_COUNT_NAME_TRIGRAM = "SELECT COUNT(*) FROM name_trigrams WHERE trigram = ?"
+SQL_SEARCH_NAME_TRIGRAM = (
+    "SELECT contacts.name, contacts.phone, contacts.email FROM name_trigrams "
+    "JOIN contacts ON contacts.phone = name_trigrams.phone WHERE trigram = ? ORDER BY name_trigrams.phone"
+)
+
+def py_lower(value: str | None) -> str | None:
+    # Встроенная lower() в SQLite понимает только ASCII, а имена бывают на кириллице
+    return value.lower() if value is not None else None
+
+
+@contextmanager
+def busy_as_error():
+    # База заблокирована записью другого процесса дольше busy timeout
+    try:
+        yield
+    except sqlite3.OperationalError as e:
+        if "locked" in str(e) or "busy" in str(e):
+            raise StorageBusyError("Storage is busy, try again later.")
+        raise
+
+
+def contact_row(contact: Contact | BatchOperation) -> tuple[str, str, str, str, str]:
+    # Строка для SQL_INSERT и SQL_IMPORT вместе с производными столбцами
+    return contact.phone, contact.name, contact.email, normalize_name(contact.name), phone_digits(contact.phone)
+
+
+def word_trigrams(word: str) -> set[str]:
+    # Триграммы слова с двумя символами отступа с каждой стороны
+    padded = f"$${word}$$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def prefix_range(prefix: str) -> tuple[str, str]:
+    # Все строки с префиксом prefix лежат в полуинтервале [prefix, prefix + максимальный символ)
+    return prefix, prefix + chr(0x10FFFF)
+
+
+class SQLiteContactRepository(ContactRepository):
+    """
+    Хранилище в SQLite: данные не ограничены объёмом памяти и переживают сбой.
+
+    Каждый рабочий поток получает своё соединение; база работает в режиме WAL,
+    поэтому чтения не блокируются записью.
+    """
+
+    def __init__(self, filename: str, import_filename: str | None = None):
+        self.filename = filename
+        self.import_filename = import_filename
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _new_connection(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.filename, cached_statements=256, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.create_function("py_lower", 1, py_lower, deterministic=True)
+        return connection
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._new_connection()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def open(self, progress: LoadProgress | None = None) -> None:
+        """
+        Создание схемы. При первом запуске контакты один раз импортируются из JSON.
+        """
+        progress = progress or LoadProgress()
+        progress.set_phase("schema")
+        connection = self._connect()
+        if connection.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        # Несколько рабочих процессов могут запускаться одновременно: схему создаёт
+        # тот, кто первым получил блокировку записи, остальные видят готовую версию
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.execute(SQL_SEED_VERSION, (time.time_ns(),))
+            if self.import_filename and os.path.exists(self.import_filename):
+                progress.set_phase("import")
+                connection.executemany(
+                    SQL_IMPORT,
+                    (contact_row(contact) for contact in FileHandler.iter_contacts(self.import_filename, progress=progress)),
+                )
+                self._index_all_names(connection)
+                logger.info(f"Contacts imported from {self.import_filename}.")
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _index_name(connection: sqlite3.Connection, phone: str, name: str) -> None:
+        """
+        Триграммы имени контакта для поиска подстроки и слова имени для нечёткого
+        поиска; новые слова попадают в словарь.
+        """
+        connection.executemany(SQL_INSERT_NAME_TRIGRAM, ((trigram, phone) for trigram in trigrams(name.lower())))
+        for word in set(fuzzy_words(name)):
+            connection.execute(SQL_INSERT_WORD, (word, phone))
+            if connection.execute(SQL_INSERT_VOCABULARY, (len(word), word)).rowcount:
+                connection.executemany(SQL_INSERT_TRIGRAM, ((trigram, word) for trigram in word_trigrams(word)))
+
+    def _index_all_names(self, connection: sqlite3.Connection) -> None:
+        for phone, name in connection.execute(SQL_SELECT_NAMES).fetchall():
+            self._index_name(connection, phone, name)
+
+    def close(self) -> None:
+        """
+        Закрытие всех соединений.
+        """
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    @busy_as_error()
+    def add_contact(self, contact: Contact) -> None:
+        try:
+            with self._connect() as connection:
+                connection.execute(SQL_INSERT, contact_row(contact))
+                self._index_name(connection, contact.phone, contact.name)
+        except sqlite3.IntegrityError:
+            raise ContactAlreadyExistsError(f"Contact with phone {contact.phone} already exists.")
+
+    def find_contact(self, phone: str) -> Contact | None:
+        row = self._connect().execute(SQL_SELECT, (phone,)).fetchone()
+        if row is None:
+            return None
+        return Contact(name=row[0], phone=row[1], email=row[2])
+
+    @busy_as_error()
+    def edit_contact(self, phone: str, name: str, email: str) -> None:
+        with self._connect() as connection:
+            cursor = connection.execute(SQL_UPDATE, (name, email, normalize_name(name), phone))
+            if cursor.rowcount:
+                self._index_name(connection, phone, name)
+        if cursor.rowcount == 0:
+            raise ContactNotFoundError(f"Contact with phone {phone} not found.")
+
+    @busy_as_error()
+    def delete_contact(self, phone: str) -> None:
+        with self._connect() as connection:
+            cursor = connection.execute(SQL_DELETE, (phone,))
+        if cursor.rowcount == 0:
+            raise ContactNotFoundError(f"Contact with phone {phone} not found.")
+
+    @busy_as_error()
+    def apply_batch(self, operations: list[BatchOperation], atomic: bool) -> list[BatchResult]:
+        """
+        Пакет выполняется в одной транзакции: одна фиксация и одна запись на диск.
+        В режиме atomic при ошибке транзакция откатывается.
+        """
+        connection = self._connect()
+        results = []
+        # Блокировка записи берётся сразу, чтобы пакеты разных процессов не мешали друг другу
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for operation in operations:
+                try:
+                    self._apply_operation(connection, operation)
+                except ContactBookError as e:
+                    results.append(BatchResult(phone=operation.phone, status="error", detail=str(e)))
+                    if atomic:
+                        break
+                    continue
+                results.append(BatchResult(phone=operation.phone, status="ok"))
+        except BaseException:
+            connection.rollback()
+            raise
+        if atomic and any(result.status == "error" for result in results):
+            connection.rollback()
+            return rollback_results(operations, results)
+        connection.commit()
+        return results
+
+    @staticmethod
+    def _apply_operation(connection: sqlite3.Connection, operation: BatchOperation) -> None:
+        if operation.op == "add":
+            try:
+                connection.execute(SQL_INSERT, contact_row(operation))
+            except sqlite3.IntegrityError:
+                raise ContactAlreadyExistsError(f"Contact with phone {operation.phone} already exists.")
+            SQLiteContactRepository._index_name(connection, operation.phone, operation.name)
+            return
+        if operation.op == "edit":
+            name = operation.name or None
+            cursor = connection.execute(
+                SQL_PATCH, (name, operation.email or None, normalize_name(name) if name else None, operation.phone)
+            )
+        else:
+            cursor = connection.execute(SQL_DELETE, (operation.phone,))
+        if cursor.rowcount == 0:
+            raise ContactNotFoundError(f"Contact with phone {operation.phone} not found.")
+        if operation.op == "edit" and name:
+            SQLiteContactRepository._index_name(connection, operation.phone, name)
+
+    def get_all_contacts(self) -> dict[str, Contact]:
+        return {
+            phone: Contact(name=name, phone=phone, email=email)
+            for name, phone, email in self._connect().execute(SQL_SELECT_ALL)
+        }
+
+    def iter_contacts(self) -> Iterator[Contact]:
+        # Отдельное соединение: обход может продолжаться в разных потоках,
+        # а один SELECT в режиме WAL читает согласованный снимок базы
+        connection = self._new_connection()
+        try:
+            for name, phone, email in connection.execute(SQL_SELECT_ALL_ORDERED):
+                yield Contact(name=name, phone=phone, email=email)
+        finally:
+            connection.close()
+
+    def version(self) -> int:
+        # Версию увеличивают триггеры, поэтому её видят и другие процессы
+        return self._connect().execute(SQL_VERSION).fetchone()[0]
+
+    def count(self) -> int:
+        return self._connect().execute(SQL_COUNT).fetchone()[0]
+
+    def find_by_email(self, email: str) -> list[Contact]:
+        return [
+            Contact(name=row[0], phone=row[1], email=row[2])
+            for row in self._connect().execute(SQL_FIND_EMAIL, (email,))
+        ]
+
+    def find_by_name(self, name: str) -> list[Contact]:
+        return [
+            Contact(name=row[0], phone=row[1], email=row[2])
+            for row in self._connect().execute(SQL_FIND_NAME, (normalize_name(name),))
+        ]
+
+    def suggest_by_name(self, prefix: str, limit: int) -> list[Contact]:
+        return [
+            Contact(name=row[0], phone=row[1], email=row[2])
+            for row in self._connect().execute(SQL_SUGGEST_NAME, (*prefix_range(normalize_name(prefix)), limit))
+        ]
+
+    def suggest_by_phone(self, prefix: str, limit: int) -> list[Contact]:
+        return [
+            Contact(name=row[0], phone=row[1], email=row[2])
+            for row in self._connect().execute(SQL_SUGGEST_PHONE, (*prefix_range(phone_digits(prefix)), limit))
+        ]
+
+    def get_page(self, order: str, after: tuple[str, str] | None, limit: int) -> list[Contact]:
+        if after is None:
+            parameters = (limit,)
+        elif order == "phone":
+            parameters = (after[1], limit)
+        else:
+            parameters = (*after, limit)
+        return [
+            Contact(name=row[0], phone=row[1], email=row[2])
+            for row in self._connect().execute(SQL_PAGE[(order, after is not None)], parameters)
+        ]
+
+    def fuzzy_search_by_name(self, name: str, max_distance: int) -> list[Contact]:
+        """
+        Кандидаты - контакты, у которых каждое слово запроса находится в словаре
+        не дальше max_distance правок. Слова словаря отбираются по триграммам:
+        каждая правка портит не больше трёх триграмм, поэтому у подходящего слова
+        общих триграмм не меньше len(триграмм запроса) - 3 * max_distance.
+        Короткие слова, для которых оценка ничего не отсекает, сравниваются
+        со словами подходящей длины. Итоговый порядок - как в базовом классе.
+        """
+        query_words = fuzzy_words(name)
+        if not query_words:
+            return []
+        connection = self._connect()
+        phones = None
+        for query_word in query_words:
+            word_phones = set()
+            for word in self._similar_words(connection, query_word, max_distance):
+                word_phones.update(row[0] for row in connection.execute(SQL_PHONES_BY_WORD, (word,)))
+            phones = word_phones if phones is None else phones & word_phones
+            if not phones:
+                return []
+        scored = []
+        for phone in phones:
+            contact = self.find_contact(phone)
+            # Оценка пересчитывается по самому имени: слова могли устареть после записи в обход приложения
+            score = fuzzy_score(query_words, fuzzy_words(contact.name), max_distance) if contact else None
+            if score is not None:
+                scored.append((score, normalize_name(contact.name), contact.phone, contact))
+        scored.sort(key=lambda item: item[:3])
+        return [item[3] for item in scored]
+
+    @staticmethod
+    def _similar_words(connection: sqlite3.Connection, query_word: str, max_distance: int) -> list[str]:
+        trigrams = word_trigrams(query_word)
+        threshold = len(trigrams) - 3 * max_distance
+        if threshold > 0:
+            shared = Counter()
+            for trigram in trigrams:
+                shared.update(row[0] for row in connection.execute(SQL_WORDS_BY_TRIGRAM, (trigram,)))
+            candidates = [word for word, count in shared.items() if count >= threshold]
+        else:
+            lengths = (len(query_word) - max_distance, len(query_word) + max_distance)
+            candidates = [row[0] for row in connection.execute(SQL_WORDS_BY_LENGTH, lengths)]
+        return [
+            word for word in candidates
+            if abs(len(word) - len(query_word)) <= max_distance and levenshtein(query_word, word) <= max_distance
+        ]
+
+    def search_by_name(self, name: str) -> list[Contact]:
+        """
+        Кандидаты - контакты с самой редкой триграммой запроса из таблицы
+        name_trigrams (обход индекса уже в порядке телефонов); подстрока
+        проверяется по самому имени. Запрос короче трёх символов не даёт
+        триграмм и проверяется перебором всех имён.
+        """
+        name = name.lower()
+        query_trigrams = trigrams(name)
+        connection = self._connect()
+        if not query_trigrams:
+            rows = connection.execute(SQL_SEARCH_NAME, (name,))
+        else:
+            rarest = min(
+                query_trigrams,
+                key=lambda trigram: connection.execute(SQL_COUNT_NAME_TRIGRAM, (trigram,)).fetchone()[0],
+            )
+            rows = (row for row in connection.execute(SQL_SEARCH_NAME_TRIGRAM, (rarest,)) if name in row[0].lower())
+        return [Contact(name=row[0], phone=row[1], email=row[2]) for row in rows]
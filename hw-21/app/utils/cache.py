@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Совпадает ли ETag с одним из значений заголовка If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class VersionedResponseCache:
+    """
+    Сериализованное тело ответа для одной версии контактной книги.
+    Пока версия не изменилась, повторный запрос не кодирует данные заново.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.body = None
+
+    def get(self, version: int) -> bytes | None:
+        return self.body if version == self.version else None
+
+    def put(self, version: int, body: bytes) -> None:
+        self.version = version
+        self.body = body
+
+
+class VersionedLRUCache:
+    """
+    Ограниченный LRU-кэш, привязанный к версии контактной книги.
+
+    Запись с другой версией недействительна: при первом обращении с новой
+    версией кэш очищается целиком, поэтому изменение книги стоит O(1).
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.version = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self, version: int) -> None:
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get(self, key: Hashable, version: int, default: Any = None) -> Any:
+        self._check_version(version)
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, version: int, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._check_version(version)
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
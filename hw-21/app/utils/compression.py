@@ -0,0 +1,61 @@
+import gzip
+import zlib
+from typing import Iterable, Iterator
+
+# Предпочтение при одинаковом q в Accept-Encoding
+ENCODINGS = ("br", "gzip")
+
+
+def accepted_encodings(accept_encoding: str | None) -> dict[str, float]:
+    """
+    Разбор Accept-Encoding: {кодировка: q}.
+    """
+    encodings = {}
+    for item in (accept_encoding or "").split(","):
+        name, *parameters = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for parameter in parameters:
+            if parameter.startswith("q="):
+                try:
+                    q = float(parameter[2:])
+                except ValueError:
+                    q = 0.0
+        encodings[name.lower()] = q
+    return encodings
+
+
+def choose_encoding(accept_encoding: str | None, available) -> str | None:
+    """
+    Лучшая из доступных кодировок, которую принимает клиент (None - без сжатия).
+    """
+    encodings = accepted_encodings(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        if encoding not in available:
+            continue
+        q = encodings.get(encoding, encodings.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def gzip_compress(body: bytes, level: int) -> bytes:
+    """
+    Сжатие тела ответа целиком. mtime=0 - одинаковый результат для одинаковых данных.
+    """
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int) -> Iterator[bytes]:
+    """
+    Потоковое сжатие: каждый фрагмент сразу сбрасывается (Z_SYNC_FLUSH),
+    поэтому клиент получает данные по мере выгрузки, а не в конце.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
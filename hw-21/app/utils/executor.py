@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterator
+from app.utils.profiling import current_profile
+from app.exceptions import ExecutorBusyError, ExecutorTimeoutError
+
+
+class Executor:
+    """
+    Пул потоков для тяжёлых операций (поиск перебором, сериализация книги,
+    выгрузка, файловый ввод-вывод), чтобы они не блокировали цикл событий.
+
+    Одновременно выполняется не больше workers операций и ждёт в очереди
+    не больше max_pending; сверх этого операции отклоняются (ExecutorBusyError).
+    Операция, не завершившаяся за timeout секунд, завершается для клиента
+    ExecutorTimeoutError; ещё не начатая - снимается с очереди, а начатая
+    доводится до конца. Поэтому записи запускаются с timeout=None: ответ 504
+    на уже зафиксированное изменение ввёл бы клиента в заблуждение.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float | None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout or None
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="contact-book")
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        # RLock: место выгрузки может освобождаться из __del__ в любой момент
+        self._lock = threading.RLock()
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.pending >= self.workers + self.max_pending:
+                self.rejected += 1
+                raise ExecutorBusyError("Server is busy, try again later.")
+            self.pending += 1
+
+    def _finished(self, _=None) -> None:
+        # Вызывается в рабочем потоке (или при отмене), поэтому под блокировкой
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        session = current_profile.get()
+        if session is not None:
+            # Запрос профилируется: операция выполняется под cProfile в рабочем потоке
+            func = partial(session.run, func)
+        return self.pool.submit(partial(func, *args))
+
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: float | None = ...) -> Any:
+        """
+        Выполнение func(*args) в пуле. timeout=None - без ограничения времени.
+        """
+        self._admit()
+        future = self._submit(func, *args)
+        future.add_done_callback(self._finished)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                self.timeout if timeout is ... else timeout,
+            )
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.timeouts += 1
+            raise ExecutorTimeoutError("Operation timed out.")
+
+    def iterate(self, iterator: Iterator[Any]) -> "ExecutorIterator":
+        """
+        Обход синхронного итератора, каждый шаг которого выполняется в пуле.
+
+        Место в очереди занимается один раз при вызове (ExecutorBusyError
+        возникает до отправки заголовков ответа) и держится до конца обхода;
+        отдельные шаги не отклоняются и не ограничены таймаутом, поэтому
+        начатая выгрузка не обрывается на середине.
+        """
+        self._admit()
+        return ExecutorIterator(self, iterator)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+class ExecutorIterator:
+    """
+    Асинхронный итератор Executor.iterate. Место в очереди освобождается
+    по окончании обхода, при ошибке, при aclose или при удалении объекта,
+    если обход так и не начался.
+    """
+
+    def __init__(self, executor: Executor, iterator: Iterator[Any]):
+        self.executor = executor
+        self.iterator = iterator
+        self.closed = False
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self
+
+    async def __anext__(self) -> Any:
+        if self.closed:
+            raise StopAsyncIteration
+        done = object()
+        try:
+            item = await asyncio.wrap_future(self.executor._submit(next, self.iterator, done))
+        except BaseException:
+            self.close()
+            raise
+        if item is done:
+            self.close()
+            raise StopAsyncIteration
+        return item
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.executor._finished()
+
+    def __del__(self):
+        self.close()
+
+
+class LoopLagMonitor:
+    """
+    Измерение задержки цикла событий: насколько позже заданного
+    просыпается задача, которая спит interval секунд.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(time.perf_counter() - started - self.interval, 0.0)
+            self.max_lag = max(self.max_lag, self.last_lag)
+
+    def stats(self) -> dict:
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+        }
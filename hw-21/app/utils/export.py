@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Iterable, Iterator
+from app.models.contact import Contact
+
+
+def iter_chunks(contacts: Iterable[Contact], chunk_size: int) -> Iterator[list[Contact]]:
+    """
+    Разбиение потока контактов на списки не длиннее chunk_size.
+    """
+    iterator = iter(contacts)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def contact_to_dict(contact: Contact) -> dict[str, str]:
+    return {"name": contact.name, "phone": contact.phone, "email": contact.email}
+
+
+def encode_contact_list(contacts: Iterable[Contact], chunk_size: int) -> bytes:
+    """
+    JSON-массив контактов. Кодируется фрагментами по chunk_size: каждый вызов
+    json.dumps короткий, поэтому рабочий поток не удерживает GIL надолго.
+    """
+    parts = (
+        json.dumps([contact_to_dict(contact) for contact in chunk], ensure_ascii=False, separators=(",", ":"))[1:-1]
+        for chunk in iter_chunks(contacts, chunk_size)
+    )
+    return ("[" + ",".join(parts) + "]").encode("utf-8")
+
+
+def encode_contact_map(contacts: Iterable[Contact], chunk_size: int) -> bytes:
+    """
+    JSON-объект {телефон: контакт}, кодируется фрагментами так же, как encode_contact_list.
+    """
+    parts = (
+        json.dumps(
+            {contact.phone: contact_to_dict(contact) for contact in chunk}, ensure_ascii=False, separators=(",", ":")
+        )[1:-1]
+        for chunk in iter_chunks(contacts, chunk_size)
+    )
+    return ("{" + ",".join(parts) + "}").encode("utf-8")
+
+
+def iter_ndjson(contacts: Iterable[Contact], chunk_size: int) -> Iterator[bytes]:
+    """
+    Выгрузка в NDJSON: один контакт - одна строка JSON, фрагментами по chunk_size контактов.
+    """
+    for chunk in iter_chunks(contacts, chunk_size):
+        yield "".join(
+            json.dumps(contact_to_dict(contact), ensure_ascii=False) + "\n"
+            for contact in chunk
+        ).encode("utf-8")
+
+
+def iter_csv(contacts: Iterable[Contact], chunk_size: int) -> Iterator[bytes]:
+    """
+    Выгрузка в CSV с заголовком name,phone,email, фрагментами по chunk_size контактов.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(("name", "phone", "email"))
+    for chunk in iter_chunks(contacts, chunk_size):
+        writer.writerows((contact.name, contact.phone, contact.email) for contact in chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Пустая книга: выгружается только заголовок
+        yield buffer.getvalue().encode("utf-8")
+
+
+# Формат выгрузки -> (тип содержимого, генератор фрагментов)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", iter_ndjson),
+    "csv": ("text/csv; charset=utf-8", iter_csv),
+}
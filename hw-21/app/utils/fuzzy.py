@@ -0,0 +1,54 @@
+import re
+
+# Транслитерация кириллицы, чтобы "Иванов" и "Ivanov" сравнивались как одно слово
+TRANSLITERATION = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya",
+})
+
+WORD_SEPARATOR = re.compile(r"[^\w]+")
+
+
+def fuzzy_words(text: str) -> list[str]:
+    """
+    Слова текста для нечёткого поиска: нижний регистр и транслитерация в латиницу.
+    Слова с цифрами пропускаются - опечатки ищутся только в буквенной части имени.
+    """
+    text = text.casefold().translate(TRANSLITERATION)
+    return [word for word in WORD_SEPARATOR.split(text) if word.isalpha()]
+
+
+def levenshtein(first: str, second: str) -> int:
+    """
+    Расстояние Левенштейна между двумя строками.
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, start=1):
+        current = [i]
+        for j, second_char in enumerate(second, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (first_char != second_char),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def fuzzy_score(query_words: list[str], words: list[str], max_distance: int) -> int | None:
+    """
+    Сумма расстояний от каждого слова запроса до ближайшего слова имени
+    или None, если какое-то слово запроса дальше max_distance.
+    """
+    score = 0
+    for query_word in query_words:
+        distance = min((levenshtein(query_word, word) for word in words), default=max_distance + 1)
+        if distance > max_distance:
+            return None
+        score += distance
+    return score
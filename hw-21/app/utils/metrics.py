@@ -0,0 +1,169 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable
+
+# Границы корзин гистограмм: длительность запроса в секундах и размер ответа в байтах
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Гистограмма в духе Prometheus: количество наблюдений по корзинам, сумма и число.
+    observe стоит O(log корзин) и не выделяет памяти.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, bool):
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_metric(name: str, kind: str, help_text: str, samples: Iterable[tuple[dict[str, str], float]]) -> list[str]:
+    """
+    Строки одной метрики (счётчика или показателя) в текстовом формате Prometheus.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{format_labels(labels)} {format_value(value)}" for labels, value in samples)
+    return lines
+
+
+def render_histogram(name: str, help_text: str, histograms: Iterable[tuple[dict[str, str], Histogram]]) -> list[str]:
+    """
+    Строки гистограммы: накопительные корзины le, _sum и _count для каждого набора меток.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in histograms:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels({**labels, 'le': format_value(bound)})} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+        lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+    return lines
+
+
+def render_stats(prefix: str, stats: dict, help_text: str) -> list[str]:
+    """
+    Числовые значения словаря stats() как отдельные метрики prefix_ключ;
+    ключи с окончанием _total - счётчики, остальные - показатели.
+    """
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, (int, float)):
+            kind = "counter" if key.endswith("_total") else "gauge"
+            lines.extend(render_metric(f"{prefix}_{key}", kind, f"{help_text}: {key}.", [({}, value)]))
+    return lines
+
+
+class HTTPMetrics:
+    """
+    Метрики HTTP-запросов по шаблонам маршрутов: количество по статусам,
+    гистограммы длительности и размера ответа, запросы в обработке.
+
+    Обновляются только из цикла событий, поэтому блокировки не нужны.
+    Метка route - шаблон пути (/api/contacts/{phone}), а не сам путь,
+    поэтому количество рядов не растёт с числом разных адресов.
+    """
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.latency = defaultdict(Histogram)
+        self.response_size = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, duration: float, size: int) -> None:
+        self.requests[(method, route, str(status))] += 1
+        self.latency[(method, route)].observe(duration)
+        self.response_size[(method, route)].observe(size)
+
+    def render(self) -> list[str]:
+        return [
+            *render_metric(
+                "http_requests_total", "counter", "HTTP requests by route and status.",
+                (({"method": method, "route": route, "status": status}, count)
+                 for (method, route, status), count in sorted(self.requests.items())),
+            ),
+            *render_histogram(
+                "http_request_duration_seconds", "Time until the last byte of the response was sent.",
+                (({"method": method, "route": route}, histogram)
+                 for (method, route), histogram in sorted(self.latency.items())),
+            ),
+            *render_histogram(
+                "http_response_size_bytes", "Response body size as sent, after compression.",
+                (({"method": method, "route": route}, histogram)
+                 for (method, route), histogram in sorted(self.response_size.items())),
+            ),
+            *render_metric("http_requests_in_flight", "gauge", "Requests being processed.", [({}, self.in_flight)]),
+        ]
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, которое записывает каждый запрос в HTTPMetrics.
+
+    Время считается до отправки последнего фрагмента тела, поэтому
+    потоковые ответы учитываются целиком. Маршрут берётся из scope["route"],
+    который FastAPI заполняет при сопоставлении пути.
+    """
+
+    def __init__(self, app, metrics: HTTPMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            self.metrics.in_flight -= 1
+            route = scope.get("route")
+            self.metrics.observe(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                time.perf_counter() - started,
+                size,
+            )
@@ -0,0 +1,26 @@
+import base64
+import json
+from app.models.contact import SORT_KEYS, Contact
+from app.exceptions import InvalidCursorError
+
+
+def encode_cursor(order: str, contact: Contact) -> str:
+    """
+    Курсор на позицию сразу после контакта: порядок сортировки и ключ (значение, телефон).
+    Курсор хранит ключ, а не номер позиции, поэтому остаётся верным при вставках.
+    """
+    payload = json.dumps([order, SORT_KEYS[order](contact), contact.phone], ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, order: str) -> tuple[str, str]:
+    """
+    Ключ (значение, телефон) из курсора, выданного для того же порядка сортировки.
+    """
+    try:
+        cursor_order, key, phone = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor.")
+    if cursor_order != order or not isinstance(key, str) or not isinstance(phone, str):
+        raise InvalidCursorError("Pagination cursor does not match the requested order.")
+    return key, phone
@@ -0,0 +1,153 @@
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileSession:
+    """
+    Профиль одного запроса: статистика cProfile всех его операций в пуле потоков.
+
+    Тяжёлая работа запроса (поиск, сериализация, выгрузка) выполняется через
+    Executor.run, который запускает её под cProfile, если у запроса есть сессия.
+    Цикл событий не профилируется: в нём же идут чужие запросы, и их вызовы
+    смешались бы с вызовами профилируемого. В Python 3.12+ это не спасает
+    рабочие потоки: cProfile включается через sys.monitoring на весь процесс,
+    поэтому операции других запросов, идущие в это время, тоже попадают
+    в профиль и замедляются.
+    """
+
+    def __init__(self, profile_id: str, method: str, path: str):
+        self.profile_id = profile_id
+        self.method = method
+        self.path = path
+        self.stats = None
+        self.calls = 0
+        self.wall_time = None
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Выполнение func(*args) под cProfile. Вызывается в рабочем потоке.
+        """
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args)
+        finally:
+            profiler.disable()
+            with self._lock:
+                if self.stats is None:
+                    self.stats = pstats.Stats(profiler)
+                else:
+                    self.stats.add(profiler)
+                self.calls += 1
+
+    def finish(self) -> None:
+        self.wall_time = time.perf_counter() - self._started
+
+    def summary(self, top: int) -> str:
+        """
+        Текстовая сводка: top функций по суммарному времени с вложенными вызовами.
+        """
+        header = (
+            f"{self.method} {self.path}\n"
+            f"wall time: {self.wall_time:.6f}s, profiled thread pool calls: {self.calls}\n"
+        )
+        if self.stats is None:
+            return header + "No work ran in the thread pool (cached or trivial response).\n"
+        stream = io.StringIO()
+        self.stats.stream = stream
+        self.stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        return header + stream.getvalue()
+
+    def save(self, directory: str, top: int) -> None:
+        """
+        Сохранение статистики (<id>.pstats, для pstats и snakeviz) и сводки (<id>.txt).
+        """
+        os.makedirs(directory, exist_ok=True)
+        if self.stats is not None:
+            self.stats.dump_stats(os.path.join(directory, f"{self.profile_id}.pstats"))
+        with open(os.path.join(directory, f"{self.profile_id}.txt"), "w", encoding="utf-8") as file:
+            file.write(self.summary(top))
+
+
+# Сессия профилирования текущего запроса; копируется в задачи, созданные запросом
+current_profile: ContextVar[ProfileSession | None] = ContextVar("current_profile", default=None)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI-middleware, которое профилирует запрос с заголовком X-Profile
+    или параметром profile. Подключается только при CONTACT_BOOK_PROFILING=1.
+
+    Если задан token, значение заголовка или параметра должно с ним совпадать.
+    Одновременно профилируется один запрос: в Python 3.12+ cProfile
+    работает на весь процесс, и параллельные профили мешали бы друг другу.
+    Остальные запросы выполняются как обычно, но в 3.12+ замедляются,
+    пока идёт профилируемая операция, поэтому при запуске пишется предупреждение. В ответ добавляется заголовок
+    X-Profile-Id; статистика и сводка сохраняются в directory после ответа.
+    """
+
+    def __init__(self, app, directory: str, top: int, token: str = ""):
+        self.app = app
+        self.directory = directory
+        self.top = top
+        self.token = token
+        self._busy = False
+        if sys.version_info >= (3, 12):
+            logger.warning(
+                "Request profiling is enabled: on Python 3.12+ cProfile traces every thread "
+                "while a profiled operation runs, which slows down other requests."
+            )
+
+    def requested(self, scope) -> bool:
+        values = [value.decode("latin-1") for name, value in scope["headers"] if name == b"x-profile"]
+        values += parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile", [])
+        if self.token:
+            return self.token in values
+        return any(value not in ("", "0", "false") for value in values)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._busy:
+            await self.app(scope, receive, self.with_header(send, b"busy"))
+            return
+        self._busy = True
+        session = ProfileSession(
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}", scope["method"], scope["path"]
+        )
+        token = current_profile.set(session)
+        try:
+            await self.app(scope, receive, self.with_header(send, session.profile_id.encode("ascii")))
+        finally:
+            current_profile.reset(token)
+            self._busy = False
+            session.finish()
+            try:
+                await asyncio.to_thread(session.save, self.directory, self.top)
+                logger.info(f"Profile {session.profile_id} of {session.method} {session.path} saved.")
+            except OSError as e:
+                logger.error(f"Error saving profile {session.profile_id}: {e}")
+
+    @staticmethod
+    def with_header(send, value: bytes):
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", value)]}
+            await send(message)
+        return send_with_header
@@ -0,0 +1,84 @@
+import math
+import time
+from app.exceptions import StorageNotReadyError
+
+
+class LoadProgress:
+    """
+    Ход фоновой загрузки хранилища для /ready и ответов 503.
+
+    Поля меняет поток загрузки, а читает цикл событий; каждое поле
+    записывается одним присваиванием, поэтому блокировка не нужна.
+    """
+
+    def __init__(self):
+        self.phase = "starting"
+        self.contacts = 0
+        self.bytes_read = 0
+        self.bytes_total = 0
+        self.error = None
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.cancelled = False
+
+    def set_phase(self, phase: str) -> None:
+        self.check_cancelled()
+        self.phase = phase
+
+    def update(self, contacts: int, bytes_read: int) -> None:
+        """
+        Отметка о прочитанных контактах. Прерывает загрузку, если она отменена.
+        """
+        self.check_cancelled()
+        self.contacts = contacts
+        self.bytes_read = bytes_read
+
+    def check_cancelled(self) -> None:
+        if self.cancelled:
+            raise StorageNotReadyError("Loading cancelled.")
+
+    def cancel(self) -> None:
+        """
+        Просьба прервать загрузку при завершении работы: поток загрузки
+        остановится на следующей отметке о ходе.
+        """
+        self.cancelled = True
+
+    def finish(self, error: Exception | None = None) -> None:
+        self.phase = "failed" if error else "ready"
+        self.error = None if error is None else str(error)
+        self.finished_at = time.monotonic()
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == "ready"
+
+    def fraction(self) -> float | None:
+        if self.ready:
+            return 1.0
+        if not self.bytes_total:
+            return None
+        return min(self.bytes_read / self.bytes_total, 1.0)
+
+    def retry_after(self) -> int:
+        """
+        Оценка оставшегося времени загрузки в секундах по скорости чтения файла.
+        """
+        fraction = self.fraction()
+        if not fraction:
+            return 1
+        elapsed = time.monotonic() - self.started_at
+        return max(1, math.ceil(elapsed * (1 - fraction) / fraction))
+
+    def stats(self) -> dict:
+        finished_at = self.finished_at or time.monotonic()
+        fraction = self.fraction()
+        return {
+            "status": self.phase,
+            "contacts_loaded": self.contacts,
+            "bytes_read": self.bytes_read,
+            "bytes_total": self.bytes_total,
+            "progress": None if fraction is None else round(fraction, 4),
+            "elapsed": round(finished_at - self.started_at, 3),
+            "error": self.error,
+        }
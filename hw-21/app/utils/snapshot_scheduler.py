@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from app.repositories.base import ContactRepository
+from app.utils.metrics import Histogram
+
+# Корзины гистограммы длительности записи снимка, в секундах
+SNAPSHOT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotScheduler:
+    """
+    Периодические фоновые снимки хранилища контактов.
+
+    Копия данных, сериализация в JSON и запись на диск выполняются
+    в рабочем потоке, поэтому цикл событий и запросы не ждут снимка.
+    """
+
+    def __init__(self, repository: ContactRepository, interval: float, dirty_threshold: int):
+        self.repository = repository
+        self.interval = interval
+        self.dirty_threshold = dirty_threshold
+        self.snapshots_total = 0
+        self.failures_total = 0
+        self.last_duration = None
+        self.last_finished_at = None
+        self.durations = Histogram(SNAPSHOT_BUCKETS)
+        self._task = None
+        self._running = asyncio.Lock()
+
+    def start(self) -> None:
+        """
+        Запуск периодических снимков (interval <= 0 отключает их).
+        """
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Остановка периодических снимков с ожиданием текущей записи.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        async with self._running:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.repository.needs_snapshot(self.dirty_threshold):
+                await self.snapshot()
+
+    async def snapshot(self) -> bool:
+        """
+        Один фоновый снимок. Возвращает True, если снимок был записан.
+        """
+        if self._running.locked():
+            return False
+        async with self._running:
+            data = await asyncio.to_thread(self.repository.begin_snapshot)
+            if data is None:
+                return False
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.repository.write_snapshot, data)
+            except Exception as e:
+                self.failures_total += 1
+                logger.error(f"Error writing snapshot: {e}")
+                return False
+            # finish_snapshot ждёт блокировку записи и удаляет файл журнала, поэтому тоже в потоке
+            await asyncio.to_thread(self.repository.finish_snapshot)
+            self.last_duration = time.perf_counter() - started
+            self.durations.observe(self.last_duration)
+            self.last_finished_at = time.time()
+            self.snapshots_total += 1
+            logger.info(f"Snapshot of {len(data)} contacts written in {self.last_duration:.3f}s.")
+            return True
+
+    def stats(self) -> dict:
+        """
+        Метрики снимков.
+        """
+        return {
+            "snapshots_total": self.snapshots_total,
+            "failures_total": self.failures_total,
+            "last_duration_seconds": self.last_duration,
+            "last_finished_at": self.last_finished_at,
+        }
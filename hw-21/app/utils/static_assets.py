@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass, field
+try:
+    import brotli
+except ImportError:
+    # Пакет brotli не установлен: отдаются только gzip и несжатые файлы
+    brotli = None
+from fastapi import Response
+from app.utils.cache import etag_matches
+from app.utils.compression import choose_encoding
+
+# Заголовки для адресов с хэшем: содержимое по такому адресу никогда не меняется
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Адреса без хэша браузер каждый раз проверяет по ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_TYPES = {"application/javascript", "application/json", "image/svg+xml", "text/javascript"}
+
+
+@dataclass
+class StaticAsset:
+    content: bytes
+    media_type: str
+    digest: str
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+
+class StaticAssets:
+    """
+    Статические файлы с хэшем содержимого в имени и заранее сжатыми вариантами.
+
+    При запуске каждый файл каталога читается один раз: вычисляется хэш
+    (css/style.css -> css/style.<хэш>.css) и сжатые варианты gzip и br
+    (если установлен brotli). Файлы небольшие, поэтому всё хранится в памяти,
+    а каталог с исходниками не меняется.
+    """
+
+    def __init__(self, directory: str, min_size: int = 256):
+        self.directory = directory
+        self.min_size = min_size
+        self.assets: dict[str, StaticAsset] = {}
+        self.hashed: dict[str, str] = {}
+        self.load()
+
+    def load(self) -> None:
+        self.assets.clear()
+        self.hashed.clear()
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.relpath(os.path.join(root, filename), self.directory).replace(os.sep, "/")
+                self.add(path)
+
+    def add(self, path: str) -> None:
+        with open(os.path.join(self.directory, path), "rb") as file:
+            content = file.read()
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        asset = StaticAsset(content, media_type, digest)
+        if len(content) >= self.min_size and (media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES):
+            # mtime=0 - одинаковый результат при каждом запуске
+            variants = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants["br"] = brotli.compress(content, quality=11)
+            asset.variants = {encoding: data for encoding, data in variants.items() if len(data) < len(content)}
+        stem, extension = os.path.splitext(path)
+        hashed_path = f"{stem}.{digest}{extension}"
+        self.assets[path] = asset
+        self.assets[hashed_path] = asset
+        self.hashed[path] = hashed_path
+
+    def url_path(self, path: str) -> str:
+        """
+        Путь файла с хэшем; для неизвестного файла - исходный путь.
+        """
+        return self.hashed.get(path, path)
+
+    def response(
+            self,
+            path: str,
+            accept_encoding: str | None,
+            if_none_match: str | None,
+            head: bool = False
+    ) -> Response | None:
+        """
+        Ответ для файла (None - файла нет). По адресу с хэшем файл кэшируется
+        навсегда, по исходному - проверяется по ETag. На HEAD - те же заголовки
+        (включая Content-Length выбранного варианта) без тела.
+
+        Диапазоны (Range) не поддерживаются, о чём сообщает Accept-Ranges: none:
+        GZipMiddleware сжал бы часть файла, и клиент не смог бы её склеить.
+        """
+        asset = self.assets.get(path)
+        if asset is None:
+            return None
+        encoding = choose_encoding(accept_encoding, asset.variants)
+        etag = f'"{asset.digest}-{encoding}"' if encoding else f'"{asset.digest}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": REVALIDATE_CACHE_CONTROL if path in self.hashed else IMMUTABLE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+            "Accept-Ranges": "none",
+        }
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        content = asset.variants.get(encoding, asset.content)
+        if head:
+            headers["Content-Length"] = str(len(content))
+            content = b""
+        return Response(content, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import time
+from app.models.contact import Contact, ContactBook
+from app.utils.metrics import Histogram
+from app.exceptions import InvalidDataFormatError
+
+OP_ADD = "add"
+OP_EDIT = "edit"
+OP_DELETE = "delete"
+OP_BATCH = "batch"
+
+# Корзины гистограммы длительности записи в журнал, в секундах
+APPEND_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+
+class WriteAheadLog:
+    """
+    Журнал изменений контактной книги (только дозапись).
+
+    Каждая операция - одна строка JSON вида
+    {"op": "add" | "edit" | "delete", "phone": ..., "name": ..., "email": ...}.
+    Пакет операций пишется одной строкой {"op": "batch", "ops": [...]},
+    поэтому после сбоя он применяется либо целиком, либо не применяется вовсе.
+    Стоимость записи зависит только от размера изменения, а не от размера книги.
+    """
+
+    def __init__(self, filename: str, fsync: bool = False):
+        self.filename = filename
+        self.fsync = fsync
+        self._file = None
+        # Размер текущего журнала в байтах. Его меняют только запись и ротация
+        # (под блокировкой записи хранилища), а читают /metrics и планировщик
+        # снимков без неё, поэтому это счётчик, а не tell() открытого файла
+        self._size = os.path.getsize(filename) if os.path.exists(filename) else 0
+        self.append_seconds = Histogram(APPEND_BUCKETS)
+        self.replay_seconds = None
+
+    def open(self) -> None:
+        """
+        Открытие журнала на дозапись.
+        """
+        if self._file is None:
+            # newline="\n": размер строки в файле равен длине её кодировки и на Windows
+            self._file = open(self.filename, "a", encoding="utf-8", newline="\n")
+            self._size = os.path.getsize(self.filename)
+
+    def close(self) -> None:
+        """
+        Закрытие журнала.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, op: str, phone: str, name: str | None = None, email: str | None = None) -> None:
+        """
+        Дозапись одной операции в журнал.
+        """
+        self._write(self._record(op, phone, name, email))
+
+    def append_batch(self, operations: list[tuple[str, str, str | None, str | None]]) -> None:
+        """
+        Дозапись пакета операций (op, phone, name, email) одной записью
+        с одним сбросом на диск.
+        """
+        self._write({"op": OP_BATCH, "ops": [self._record(*operation) for operation in operations]})
+
+    @staticmethod
+    def _record(op: str, phone: str, name: str | None, email: str | None) -> dict:
+        record = {"op": op, "phone": phone}
+        if op != OP_DELETE:
+            record["name"] = name
+            record["email"] = email
+        return record
+
+    def _write(self, record: dict) -> None:
+        started = time.perf_counter()
+        self.open()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._size += len(line.encode("utf-8"))
+        self.append_seconds.observe(time.perf_counter() - started)
+
+    def size(self) -> int:
+        """
+        Текущий размер журнала в байтах. Безопасно вызывать из любого потока.
+        """
+        return self._size
+
+    @property
+    def rotated_filename(self) -> str:
+        return f"{self.filename}.1"
+
+    def rotate(self) -> None:
+        """
+        Перенос текущего журнала в rotated_filename и начало нового.
+
+        Используется при фоновом снимке: записи до ротации попадут в снимок,
+        а новые изменения пишутся в свежий журнал. Если предыдущий снимок
+        не завершился, текущий журнал дописывается к уже перенесённому.
+        """
+        self.close()
+        if os.path.exists(self.filename):
+            if os.path.exists(self.rotated_filename):
+                with open(self.filename, "rb") as src, open(self.rotated_filename, "ab") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.filename)
+            else:
+                os.replace(self.filename, self.rotated_filename)
+        self.open()
+
+    def discard_rotated(self) -> None:
+        """
+        Удаление перенесённого журнала после того, как снимок записан.
+        """
+        if os.path.exists(self.rotated_filename):
+            os.remove(self.rotated_filename)
+
+    def replay(self, contact_book: ContactBook) -> int:
+        """
+        Применение журнала (сначала перенесённого, затем текущего) поверх снимка.
+
+        Операции идемпотентны, поэтому повторное применение журнала
+        (например, после сбоя во время сворачивания) безопасно.
+        Возвращает количество применённых операций.
+        """
+        started = time.perf_counter()
+        applied = 0
+        for filename in (self.rotated_filename, self.filename):
+            if os.path.exists(filename):
+                applied += self._replay_file(filename, contact_book)
+        self.replay_seconds = time.perf_counter() - started
+        return applied
+
+    def _replay_file(self, filename: str, contact_book: ContactBook) -> int:
+        applied = 0
+        offset = 0
+        with open(filename, "r", encoding="utf-8", newline="") as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.endswith("\n"):
+                    # Незавершённая запись после сбоя - отбрасываем её, чтобы новые
+                    # записи не склеились с её остатком
+                    os.truncate(filename, offset)
+                    break
+                offset += len(line.encode("utf-8"))
+                try:
+                    record = json.loads(line)
+                    records = record["ops"] if record["op"] == OP_BATCH else [record]
+                    for record in records:
+                        self._apply(record, contact_book)
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                    raise InvalidDataFormatError(f"Invalid record in {filename} at line {line_number}.")
+                applied += len(records)
+        return applied
+
+    @staticmethod
+    def _apply(record: dict, contact_book: ContactBook) -> None:
+        op, phone = record["op"], record["phone"]
+        if op == OP_ADD:
+            contact_book.put_contact(Contact(name=record["name"], phone=phone, email=record["email"]))
+        elif op == OP_EDIT:
+            if contact_book.find_contact(phone):
+                contact_book.edit_contact(phone, record["name"], record["email"])
+        elif op == OP_DELETE:
+            contact_book.discard_contact(phone)
+        else:
+            raise ValueError(f"Unknown operation {op}.")
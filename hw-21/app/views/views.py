@@ -1,21 +1,88 @@
-from fastapi import APIRouter, Request
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from fastapi.templating import Jinja2Templates
-from app.api.contacts import contact_book
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from markupsafe import Markup
+from app.api.contacts import executor, repository, wait_for_contacts
+from app.utils.cache import VersionedLRUCache
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.static_assets import StaticAssets
+from app.exceptions import InvalidCursorError
+from app.config import PAGE_SIZE, MAX_PAGE_SIZE, VIEW_CACHE_SIZE, TEMPLATE_CACHE_DIR
+
+if TEMPLATE_CACHE_DIR:
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/views/templates")
+# Скомпилированные шаблоны сохраняются на диске, и новые процессы не разбирают их заново
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), "templates")),
+    bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+    autoescape=True,
+))
+
+# Статические файлы с хэшем в имени; в шаблонах адрес даёт static_url("css/style.css")
+static_assets = StaticAssets(os.path.join(os.path.dirname(os.path.dirname(__file__)), "static"))
+templates.env.globals["static_url"] = lambda path: f"/static/{static_assets.url_path(path)}"
+
+# Готовые таблицы страниц главной страницы для текущей версии книги
+table_cache = VersionedLRUCache(VIEW_CACHE_SIZE)
 
-@router.get("/")
-async def index(request: Request):
+
+def render_table(order: str, after: tuple[str, str] | None, limit: int) -> str:
     """
-    Главная страница: отображает список контактов.
+    Таблица одной страницы контактов со ссылками на сортировку и следующую страницу.
     """
-    contacts = contact_book.get_all_contacts()
-    return templates.TemplateResponse("index.html", {"request": request, "contacts": contacts})
+    contacts = repository.get_page(order, after, limit + 1)
+    next_cursor = encode_cursor(order, contacts[limit - 1]) if len(contacts) > limit else None
+    return templates.get_template("contacts_table.html").render(
+        contacts=contacts[:limit], next_cursor=next_cursor, first_page=after is None, order=order, limit=limit
+    )
+
+
+@router.get("/", dependencies=[Depends(wait_for_contacts)])
+async def index(
+        request: Request,
+        limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+        cursor: str = Query(None, description="Cursor of the next page"),
+        order: str = Query("phone", pattern="^(phone|name)$", description="Sort order: phone or name")
+):
+    """
+    Главная страница: одна страница списка контактов.
+    Таблица страницы строится один раз на версию книги.
+    """
+    try:
+        after = decode_cursor(cursor, order) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Версия читается до данных, как и в кэше полного списка API
+    version = repository.version()
+    key = (order, after, limit)
+    table = table_cache.get(key, version)
+    if table is None:
+        table = await executor.run(render_table, order, after, limit)
+        table_cache.put(key, version, table)
+    return templates.TemplateResponse("index.html", {"request": request, "table": Markup(table)})
 
 @router.get("/about/")
 async def about(request: Request):
     """
     Страница "О сайте".
     """
-    return templates.TemplateResponse("about.html", {"request": request})
\ No newline at end of file
+    return templates.TemplateResponse("about.html", {"request": request})
+
+@router.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def static(
+        request: Request,
+        path: str,
+        accept_encoding: str = Header(None),
+        if_none_match: str = Header(None)
+):
+    """
+    Статический файл: сжатый вариант выбирается по Accept-Encoding.
+    HEAD отвечает теми же заголовками без тела, как StaticFiles.
+    """
+    response = static_assets.response(path, accept_encoding, if_none_match, head=request.method == "HEAD")
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
@@ -0,0 +1,83 @@
+"""
+Сравнение поиска по имени: полный перебор и индексы
+(триграммный для подстроки, BK-дерево для нечёткого поиска).
+
+Запуск из каталога hw-21:
+    python -m benchmarks.bench_search --size 1000000
+"""
+import argparse
+import random
+import time
+from app.models.contact import Contact, ContactBook
+from app.repositories.base import ContactRepository
+
+FIRST_NAMES = ["Иван", "Пётр", "Анна", "Мария", "Roman", "Stone", "Olga", "Sergey", "Елена", "Дмитрий"]
+LAST_NAMES = ["Иванов", "Петров", "Сидорова", "Соланов", "Smith", "Kuznetsov", "Popova", "Волков"]
+
+
+def build_book(size: int) -> ContactBook:
+    random.seed(42)
+    book = ContactBook()
+    book.load(
+        Contact(
+            name=f"{random.choice(LAST_NAMES)} {random.choice(FIRST_NAMES)} {i}",
+            phone=f"+7{i:010d}",
+            email=f"user{i}@example.com",
+        )
+        for i in range(size)
+    )
+    return book
+
+
+def scan(book: ContactBook, name: str) -> list[Contact]:
+    name = name.lower()
+    return [contact for contact in book.get_all_contacts().values() if name in contact.name.lower()]
+
+
+def fuzzy_scan(book: ContactBook, name: str) -> list[Contact]:
+    return ContactRepository.fuzzy_search_by_name(book, name, 2)
+
+
+def fuzzy_index(book: ContactBook, name: str) -> list[Contact]:
+    return book.fuzzy_search_by_name(name, 2)
+
+
+def measure(function, book: ContactBook, query: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(book, query)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    book = build_book(args.size)
+    print(f"Built {args.size} contacts in {time.perf_counter() - started:.1f}s")
+
+    for query in ["соланов roman 12345", "12345", "smith olga"]:
+        expected = scan(book, query)
+        assert book.search_by_name(query) == sorted(expected, key=lambda contact: contact.phone)
+        scan_time = measure(scan, book, query, max(1, args.repeat // 10))
+        index_time = measure(ContactBook.search_by_name, book, query, args.repeat)
+        print(
+            f"{query!r}: {len(expected)} results, "
+            f"scan {scan_time * 1000:.2f} ms, index {index_time * 1000:.3f} ms"
+        )
+
+    for query in ["Ivanof Petr", "Sidorva"]:
+        expected = fuzzy_index(book, query)
+        scan_time = measure(fuzzy_scan, book, query, 1)
+        index_time = measure(fuzzy_index, book, query, max(1, args.repeat // 10))
+        print(
+            f"fuzzy {query!r}: {len(expected)} results, "
+            f"scan {scan_time * 1000:.2f} ms, index {index_time * 1000:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
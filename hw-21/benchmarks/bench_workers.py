@@ -0,0 +1,101 @@
+"""
+Проверка работы нескольких процессов uvicorn с общим хранилищем sqlite:
+запись через случайные процессы должна быть видна во всех, а скорость
+чтения - расти с числом процессов.
+
+Запуск из каталога hw-21:
+    python -m benchmarks.bench_workers --workers 1 4 --requests 5000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(url: str, method: str = "GET") -> tuple[int, bytes]:
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method=method), timeout=30) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def add_contact(base_url: str, phone: str) -> int:
+    parameters = urllib.parse.urlencode({"phone": phone, "name": f"Name {phone}", "email": "user@example.com"})
+    return request(f"{base_url}/contacts/?{parameters}", method="POST")[0]
+
+
+def start_server(workers: int, port: int, directory: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        CONTACT_BOOK_STORAGE="sqlite",
+        CONTACT_BOOK_SQLITE_FILE=os.path.join(directory, "contact_book.db"),
+        CONTACT_BOOK_FILE=os.path.join(directory, "contact_book.json"),
+        WEB_CONCURRENCY=str(workers),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if request(f"{base_url}/ready")[0] == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("Server did not start.")
+
+
+def run(workers: int, requests: int, concurrency: int, port: int) -> None:
+    base_url = f"http://127.0.0.1:{port}/api"
+    with tempfile.TemporaryDirectory() as directory:
+        server = start_server(workers, port, directory)
+        try:
+            with ThreadPoolExecutor(concurrency) as pool:
+                # Записи расходятся по процессам, которые принимают соединения
+                phones = [f"+7{i:010d}" for i in range(concurrency * 10)]
+                statuses = list(pool.map(lambda phone: add_contact(base_url, phone), phones))
+                assert statuses == [200] * len(phones), "Some writes failed."
+
+                # Каждое чтение может попасть в любой процесс и должно видеть все записи
+                bodies = list(pool.map(lambda _: request(base_url + "/contacts/")[1], range(concurrency * 4)))
+                assert all(len(json.loads(body)) == len(phones) for body in bodies), "Workers disagree."
+
+                started = time.perf_counter()
+                list(pool.map(
+                    lambda i: request(base_url + "/contacts/search/?" + urllib.parse.urlencode(
+                        {"phone": phones[i % len(phones)]}
+                    )),
+                    range(requests),
+                ))
+                elapsed = time.perf_counter() - started
+            print(f"workers={workers}: {len(phones)} writes consistent, {requests / elapsed:,.0f} reads/s")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    for workers in args.workers:
+        run(workers, args.requests, args.concurrency, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import time
+
+# The application reads its settings on import, so the API tests get their own
+# storage directory before anything from app is imported
+STORAGE_DIR = tempfile.mkdtemp(prefix="contact-book-tests-")
+os.environ.setdefault("CONTACT_BOOK_STORAGE", "memory")
+os.environ.setdefault("CONTACT_BOOK_FILE", os.path.join(STORAGE_DIR, "contact_book.json"))
+os.environ.setdefault("CONTACT_BOOK_WAL_FILE", os.path.join(STORAGE_DIR, "contact_book.wal"))
+os.environ.setdefault("CONTACT_BOOK_SQLITE_FILE", os.path.join(STORAGE_DIR, "contact_book.db"))
+os.environ.setdefault("CONTACT_BOOK_SNAPSHOT_INTERVAL", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+from app.models.contact import ContactBook
+from app.repositories.memory import MemoryContactRepository
+from app.repositories.sqlite import SQLiteContactRepository
+from app.utils.wal import WriteAheadLog
+
+
+
+def make_repository(backend, directory):
+    """
+    Create and open a repository that keeps its files in the given directory.
+
+    A small merge threshold makes the memory repository merge its changes layer
+    during the tests instead of keeping every change in the layer.
+
+    Args:
+        backend (str): "memory" or "sqlite".
+        directory (pathlib.Path): Directory for the storage files.
+
+    Returns:
+        ContactRepository: An opened repository with no contacts.
+    """
+    if backend == "memory":
+        repository = MemoryContactRepository(
+            str(directory / "contact_book.json"),
+            str(directory / "contact_book.wal"),
+            compact_threshold=4 * 1024 * 1024,
+            merge_threshold=4,
+        )
+    else:
+        repository = SQLiteContactRepository(str(directory / "contact_book.db"))
+    repository.open()
+    return repository
+
+
+
+def add_contact(client, phone, name, email="test@example.com"):
+    """
+    Add a contact through the API and check that it was accepted.
+
+    Args:
+        client (TestClient): The test client.
+        phone (str): Phone of the new contact.
+        name (str): Name of the new contact.
+        email (str): Email of the new contact.
+    """
+    response = client.post("/api/contacts/", params={"phone": phone, "name": name, "email": email})
+    assert response.status_code == 200, response.text
+
+
+
+@pytest.fixture
+def contact_book():
+    """
+    Fixture to provide an empty ContactBook.
+
+    Returns:
+        ContactBook: A new instance of ContactBook with no contacts.
+    """
+    return ContactBook()
+
+
+
+@pytest.fixture
+def wal(tmp_path):
+    """
+    Fixture to provide a write-ahead log in a temporary directory.
+
+    Returns:
+        WriteAheadLog: A log that has not been written yet.
+    """
+    log = WriteAheadLog(str(tmp_path / "contact_book.wal"))
+    yield log
+    log.close()
+
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    """
+    Fixture to provide each storage backend in turn.
+
+    Returns:
+        ContactRepository: An opened repository with no contacts.
+    """
+    repository = make_repository(request.param, tmp_path)
+    yield repository
+    repository.close()
+
+
+
+@pytest.fixture
+def repositories(tmp_path):
+    """
+    Fixture to provide both storage backends side by side for parity checks.
+
+    Returns:
+        tuple: An opened memory repository and an opened SQLite repository.
+    """
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "sqlite").mkdir()
+    memory = make_repository("memory", tmp_path / "memory")
+    sqlite = make_repository("sqlite", tmp_path / "sqlite")
+    yield memory, sqlite
+    memory.close()
+    sqlite.close()
+
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Fixture to provide a test client for the application once the contacts are loaded.
+
+    The application keeps its storage and executor in module globals, so one
+    client is shared by all API tests; the tests use their own phone numbers.
+
+    Returns:
+        TestClient: A client with the application started.
+    """
+    from app.main import app
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 10
+        while client.get("/ready").status_code != 200:
+            assert time.monotonic() < deadline, "Contacts were not loaded in time."
+            time.sleep(0.01)
+        yield client
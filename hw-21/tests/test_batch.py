@@ -0,0 +1,98 @@
+from app.models.batch import BatchOperation
+from app.models.contact import Contact
+from conftest import add_contact, make_repository
+
+
+
+def test_atomic_batch_rolls_back(repository):
+    """
+    Test that an atomic batch with a failing operation changes nothing.
+
+    Args:
+        repository (ContactRepository): The repository instance.
+    """
+    repository.add_contact(Contact(name="Ivanov Peter", phone="+1234567890", email="ivanov.peter@example.com"))
+    version = repository.version()
+
+    results = repository.apply_batch([
+        BatchOperation(op="add", phone="+1234567891", name="Petrov Ivan", email="petrov.ivan@example.com"),
+        BatchOperation(op="add", phone="+1234567890", name="Ivanov Petr", email="ivanov.petr@example.com"),
+        BatchOperation(op="delete", phone="+1234567890"),
+    ], atomic=True)
+
+    assert [result.status for result in results] == ["rolled_back", "error", "skipped"]
+    assert repository.find_contact("+1234567891") is None
+    assert repository.find_contact("+1234567890").name == "Ivanov Peter"
+    assert repository.version() == version
+
+
+
+def test_best_effort_batch_skips_errors(repository):
+    """
+    Test that a best-effort batch applies every operation that does not fail.
+
+    Args:
+        repository (ContactRepository): The repository instance.
+    """
+    repository.add_contact(Contact(name="Ivanov Peter", phone="+1234567890", email="ivanov.peter@example.com"))
+
+    results = repository.apply_batch([
+        BatchOperation(op="add", phone="+1234567891", name="Petrov Ivan", email="petrov.ivan@example.com"),
+        BatchOperation(op="edit", phone="+1234567899", name="Nobody"),
+        BatchOperation(op="edit", phone="+1234567890", email="peter@example.com"),
+    ], atomic=False)
+
+    assert [result.status for result in results] == ["ok", "error", "ok"]
+    assert repository.find_contact("+1234567891").name == "Petrov Ivan"
+    assert repository.find_contact("+1234567890") == Contact(
+        name="Ivanov Peter", phone="+1234567890", email="peter@example.com"
+    )
+
+
+
+def test_batch_survives_restart(tmp_path):
+    """
+    Test that a memory repository restores a batch from its log after a crash.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the storage files.
+    """
+    repository = make_repository("memory", tmp_path)
+    repository.apply_batch([
+        BatchOperation(op="add", phone="+1234567890", name="Ivanov Peter", email="ivanov.peter@example.com"),
+        BatchOperation(op="add", phone="+1234567891", name="Petrov Ivan", email="petrov.ivan@example.com"),
+    ], atomic=True)
+    # Crash: the log is left as it is, without a snapshot on close
+    repository.wal.close()
+    repository._release_lock()
+
+    restored = make_repository("memory", tmp_path)
+    try:
+        assert sorted(restored.get_all_contacts()) == ["+1234567890", "+1234567891"]
+    finally:
+        restored.close()
+
+
+
+def test_batch_endpoint_atomic(client):
+    """
+    Test that a failing atomic batch answers 409 and changes nothing.
+
+    Args:
+        client (TestClient): The test client.
+    """
+    add_contact(client, "+10000000401", "Batch Test")
+    operations = [
+        {"op": "add", "phone": "+10000000402", "name": "Batch New", "email": "new@example.com"},
+        {"op": "add", "phone": "+10000000401", "name": "Batch Duplicate", "email": "dup@example.com"},
+    ]
+
+    response = client.post("/api/contacts/batch", json=operations)
+    assert response.status_code == 409
+    assert [result["status"] for result in response.json()["results"]] == ["rolled_back", "error"]
+    assert client.get("/api/contacts/search/", params={"phone": "+10000000402"}).status_code == 404
+
+    response = client.post("/api/contacts/batch", params={"mode": "best_effort"}, json=operations)
+    assert response.status_code == 200
+    assert response.json()["applied"] == 1
+    assert client.get("/api/contacts/search/", params={"phone": "+10000000402"}).status_code == 200
@@ -0,0 +1,37 @@
+from app.utils.cache import etag_matches
+from conftest import add_contact
+
+
+
+def test_etag_matches():
+    """
+    Test If-None-Match parsing: lists, weak validators and the wildcard.
+    """
+    assert etag_matches('"1", W/"2"', '"2"')
+    assert etag_matches("*", '"3"')
+    assert not etag_matches('"1"', '"1-gzip"')
+    assert not etag_matches(None, '"1"')
+
+
+
+def test_contacts_etag(client):
+    """
+    Test that the full list has an ETag, answers 304 to a matching If-None-Match
+    and gets a new ETag after a change.
+
+    Args:
+        client (TestClient): The test client.
+    """
+    response = client.get("/api/contacts/")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    response = client.get("/api/contacts/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    add_contact(client, "+10000000001", "Etag Test")
+    response = client.get("/api/contacts/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "+10000000001" in response.json()
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+import pytest
+import app.api.contacts as contacts_api
+from app.utils.executor import Executor
+from app.exceptions import ExecutorBusyError, ExecutorTimeoutError
+
+
+
+@pytest.fixture
+def small_executor(monkeypatch):
+    """
+    Fixture to replace the API executor with a single-worker one without a queue.
+
+    Returns:
+        Executor: The executor used by the API during the test.
+    """
+    executor = Executor(workers=1, max_pending=0, timeout=0.05)
+    monkeypatch.setattr(contacts_api, "executor", executor)
+    yield executor
+    executor.shutdown()
+
+
+
+def test_executor_rejects_when_full():
+    """
+    Test that the executor rejects operations beyond workers + max_pending
+    and accepts them again once a slot is free.
+    """
+    executor = Executor(workers=1, max_pending=0, timeout=None)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(lambda: None)
+        release.set()
+        await running
+        return await executor.run(lambda: "done")
+
+    try:
+        assert asyncio.run(main()) == "done"
+        assert executor.stats()["rejected"] == 1
+        assert executor.stats()["pending"] == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+
+def test_executor_timeout():
+    """
+    Test that an operation longer than the timeout fails with ExecutorTimeoutError,
+    while timeout=None waits for it.
+    """
+    executor = Executor(workers=1, max_pending=1, timeout=0.01)
+    release = threading.Event()
+
+    async def main():
+        with pytest.raises(ExecutorTimeoutError):
+            await executor.run(release.wait, 1)
+        release.set()
+        return await executor.run(lambda: "done", timeout=None)
+
+    try:
+        assert asyncio.run(main()) == "done"
+        assert executor.stats()["timeouts"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+
+def test_executor_iterate_holds_one_slot():
+    """
+    Test that iterate takes one slot for the whole walk and frees it at the end.
+    """
+    executor = Executor(workers=1, max_pending=0, timeout=0.01)
+
+    async def main():
+        iterator = executor.iterate(iter(range(3)))
+        with pytest.raises(ExecutorBusyError):
+            executor.iterate(iter(()))
+        return [item async for item in iterator]
+
+    try:
+        assert asyncio.run(main()) == [0, 1, 2]
+        assert executor.stats()["pending"] == 0
+    finally:
+        executor.shutdown()
+
+
+
+def test_executor_busy_gives_503(client, small_executor):
+    """
+    Test that reads rejected by a full executor get 503 with Retry-After.
+
+    Args:
+        client (TestClient): The test client.
+        small_executor (Executor): The executor used by the API.
+    """
+    small_executor.pending = small_executor.workers
+    try:
+        responses = [
+            client.get("/api/contacts/", params={"limit": 1}),
+            client.get("/api/contacts/suggest", params={"prefix": "Iv"}),
+            client.get("/api/contacts/suggest", params={"prefix": "+7 900"}),
+        ]
+    finally:
+        small_executor.pending = 0
+    for response in responses:
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+
+
+def test_executor_timeout_gives_504(client, small_executor, monkeypatch):
+    """
+    Test that a read that does not finish within the executor timeout gets 504.
+
+    Args:
+        client (TestClient): The test client.
+        small_executor (Executor): The executor used by the API.
+    """
+    get_page_body = contacts_api.get_page_body
+
+    def slow_page_body(*args):
+        time.sleep(0.2)
+        return get_page_body(*args)
+
+    monkeypatch.setattr(contacts_api, "get_page_body", slow_page_body)
+    assert client.get("/api/contacts/", params={"limit": 1}).status_code == 504
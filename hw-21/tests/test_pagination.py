@@ -0,0 +1,88 @@
+import pytest
+from app.models.contact import Contact
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.exceptions import InvalidCursorError
+from conftest import add_contact
+
+
+
+def test_cursor_round_trip():
+    """
+    Test that a cursor decodes to the key of the contact it was made from.
+    """
+    contact = Contact(name="Ёлкин Пётр", phone="+1234567890", email="elkin@example.com")
+    assert decode_cursor(encode_cursor("name", contact), "name") == ("ёлкин пётр", "+1234567890")
+    assert decode_cursor(encode_cursor("phone", contact), "phone") == ("+1234567890", "+1234567890")
+
+
+
+def test_cursor_rejects_other_order_and_garbage():
+    """
+    Test that a cursor for another order or an invalid cursor raises InvalidCursorError.
+    """
+    contact = Contact(name="Ivanov Peter", phone="+1234567890", email="ivanov.peter@example.com")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor("phone", contact), "name")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not a cursor", "phone")
+
+
+
+def read_all_pages(client, order, limit, between_pages=None):
+    """
+    Walk GET /api/contacts/ page by page with next_cursor.
+
+    Args:
+        between_pages (Callable, optional): Called after the first page.
+
+    Returns:
+        list[str]: Phones in page order.
+    """
+    phones = []
+    params = {"order": order, "limit": limit}
+    while True:
+        response = client.get("/api/contacts/", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        phones += [contact["phone"] for contact in page["items"]]
+        if page["next_cursor"] is None:
+            return phones
+        if between_pages is not None:
+            between_pages()
+            between_pages = None
+        params["cursor"] = page["next_cursor"]
+
+
+
+def test_keyset_cursor_pages(client):
+    """
+    Test that cursor pages return every contact once, even when contacts
+    are added between pages.
+
+    Args:
+        client (TestClient): The test client.
+    """
+    for number in range(5):
+        add_contact(client, f"+1000000010{number}", f"Cursor Test {number}")
+
+    assert read_all_pages(client, "phone", 2) == sorted(client.get("/api/contacts/").json())
+
+    phones = read_all_pages(
+        client, "name", 2, between_pages=lambda: add_contact(client, "+10000000199", "zzz Cursor Test")
+    )
+    assert len(phones) == len(set(phones))
+    assert phones[-1] == "+10000000199"
+
+
+
+def test_invalid_cursor(client):
+    """
+    Test that a malformed cursor or a cursor for another order gives 400.
+
+    Args:
+        client (TestClient): The test client.
+    """
+    add_contact(client, "+10000000201", "Cursor Order Test")
+    cursor = client.get("/api/contacts/", params={"limit": 1}).json()["next_cursor"]
+    assert client.get("/api/contacts/", params={"cursor": cursor, "order": "name"}).status_code == 400
+    assert client.get("/api/contacts/", params={"cursor": "garbage"}).status_code == 400
@@ -0,0 +1,30 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import app.api.profiles as profiles_api
+
+
+
+def test_profiles_require_token(tmp_path, monkeypatch):
+    """
+    Test that saved profiles are only served with CONTACT_BOOK_PROFILING_TOKEN.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the profiles.
+    """
+    profile_id = "20260101-120000-0123abcd"
+    (tmp_path / f"{profile_id}.txt").write_text("summary", encoding="utf-8")
+    monkeypatch.setattr(profiles_api, "PROFILE_DIR", str(tmp_path))
+    application = FastAPI()
+    application.include_router(profiles_api.router)
+    client = TestClient(application)
+
+    monkeypatch.setattr(profiles_api, "PROFILING_TOKEN", "")
+    assert client.get(f"/profiles/{profile_id}").status_code == 403
+
+    monkeypatch.setattr(profiles_api, "PROFILING_TOKEN", "secret")
+    assert client.get(f"/profiles/{profile_id}").status_code == 403
+    assert client.get(f"/profiles/{profile_id}", headers={"X-Profile-Token": "wrong"}).status_code == 403
+    response = client.get(f"/profiles/{profile_id}", headers={"X-Profile-Token": "secret"})
+    assert response.status_code == 200
+    assert response.text == "summary"
+    assert client.get(f"/profiles/{profile_id}", params={"token": "secret"}).status_code == 200
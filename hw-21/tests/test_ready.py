@@ -0,0 +1,35 @@
+import asyncio
+import app.api.contacts as contacts_api
+import app.api.health as health_api
+from app.utils.progress import LoadProgress
+
+
+
+def test_ready(client, monkeypatch):
+    """
+    Test /ready and data requests before the book is loaded, after a failed
+    load and once it is loaded.
+
+    Args:
+        client (TestClient): The test client.
+    """
+    assert client.get("/live").status_code == 200
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    progress = LoadProgress()
+    monkeypatch.setattr(health_api, "load_progress", progress)
+    monkeypatch.setattr(contacts_api, "load_progress", progress)
+    monkeypatch.setattr(contacts_api, "contacts_ready", asyncio.Event())
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    assert "Retry-After" in response.headers
+    assert client.get("/api/contacts/", params={"limit": 1}).status_code == 503
+
+    progress.finish(OSError("disk failure"))
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["error"] == "disk failure"
+    assert "Retry-After" not in response.headers
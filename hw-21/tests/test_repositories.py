@@ -0,0 +1,165 @@
+import pytest
+from app.models.batch import BatchOperation
+from app.models.contact import Contact
+from app.exceptions import ContactAlreadyExistsError, ContactNotFoundError
+
+
+
+NAMES = ["Ivanov Peter", "ivanov peter", "Ivanova Anna", "Petrov Ivan", "Ёлкин Пётр", "Sidorov Oleg", "Ivan"]
+
+
+
+def seed_contacts(repository, count=40):
+    """
+    Add contacts with repeated names, mixed case and non-ASCII letters.
+
+    Args:
+        repository (ContactRepository): The repository to fill.
+        count (int): Number of contacts to add.
+    """
+    for number in range(count):
+        name = NAMES[number % len(NAMES)]
+        repository.add_contact(Contact(name=name, phone=f"+7900{number:07d}", email=f"user{number % 5}@example.com"))
+
+
+
+def change_contacts(repository):
+    """
+    Apply the same mix of single changes and batches to a seeded repository.
+
+    Args:
+        repository (ContactRepository): The repository to change.
+    """
+    repository.edit_contact("+79000000003", "Ivanov Petr", "user3@example.com")
+    repository.delete_contact("+79000000004")
+    repository.apply_batch([
+        BatchOperation(op="add", phone="+79000000100", name="Ivonov Peter", email="new@example.com"),
+        BatchOperation(op="edit", phone="+79000000010", name="Петрова Анна"),
+        BatchOperation(op="delete", phone="+79000000011"),
+        BatchOperation(op="delete", phone="+79000000404"),
+    ], atomic=False)
+
+
+
+def read_all_pages(repository, order, limit):
+    """
+    Walk the repository page by page with keyset cursors.
+
+    Returns:
+        list[str]: Phones in page order.
+    """
+    phones = []
+    after = None
+    while True:
+        page = repository.get_page(order, after, limit)
+        phones += [contact.phone for contact in page]
+        if len(page) < limit:
+            return phones
+        last = page[-1]
+        after = (last.phone if order == "phone" else last.name.casefold(), last.phone)
+
+
+
+def test_add_find_edit_delete(repository):
+    """
+    Test the basic operations of the repository interface on each backend.
+
+    Args:
+        repository (ContactRepository): The repository instance.
+    """
+    contact = Contact(name="Ivanov Peter", phone="+1234567890", email="ivanov.peter@example.com")
+    repository.add_contact(contact)
+    assert repository.find_contact("+1234567890") == contact
+    with pytest.raises(ContactAlreadyExistsError):
+        repository.add_contact(contact)
+
+    version = repository.version()
+    repository.edit_contact("+1234567890", "Ivanov Petr", "ivanov.petr@example.com")
+    assert repository.find_contact("+1234567890") == Contact(
+        name="Ivanov Petr", phone="+1234567890", email="ivanov.petr@example.com"
+    )
+    assert repository.version() != version
+    assert repository.count() == 1
+
+    repository.delete_contact("+1234567890")
+    assert repository.find_contact("+1234567890") is None
+    with pytest.raises(ContactNotFoundError):
+        repository.delete_contact("+1234567890")
+    with pytest.raises(ContactNotFoundError):
+        repository.edit_contact("+1234567890", "Ivanov Petr", "ivanov.petr@example.com")
+
+
+
+def test_backends_give_same_results(repositories):
+    """
+    Test that the memory and SQLite repositories answer every query the same way.
+
+    Args:
+        repositories (tuple): The memory and SQLite repositories.
+    """
+    memory, sqlite = repositories
+    for repository in repositories:
+        seed_contacts(repository)
+        change_contacts(repository)
+
+    assert memory.get_all_contacts() == sqlite.get_all_contacts()
+    assert memory.count() == sqlite.count() == 39
+    for phone in ("+79000000003", "+79000000004", "+79000000100", "+79000000404"):
+        assert memory.find_contact(phone) == sqlite.find_contact(phone)
+    # The order of email matches is not specified
+    assert sorted(contact.phone for contact in memory.find_by_email("user1@example.com")) == \
+        sorted(contact.phone for contact in sqlite.find_by_email("user1@example.com"))
+    for name in ("IVANOV PETER", "ёлкин пётр", "Ivan", "Nobody"):
+        assert memory.find_by_name(name) == sqlite.find_by_name(name)
+    for name in ("ivan", "ПЁТР", "ova", "zzz"):
+        assert memory.search_by_name(name) == sqlite.search_by_name(name)
+    for name in ("Ivonov Pter", "Петрова", "Sidorv"):
+        assert memory.fuzzy_search_by_name(name, 2) == sqlite.fuzzy_search_by_name(name, 2)
+    assert memory.suggest_by_name("iv", 5) == sqlite.suggest_by_name("iv", 5)
+    assert memory.suggest_by_phone("8 (900) 000-00-1", 5) == sqlite.suggest_by_phone("8 (900) 000-00-1", 5)
+    for order in ("phone", "name"):
+        assert read_all_pages(memory, order, 7) == read_all_pages(sqlite, order, 7)
+
+
+
+def test_keyset_pages_cover_every_contact(repository):
+    """
+    Test that walking the pages returns every contact once in sort order.
+
+    Args:
+        repository (ContactRepository): The repository instance.
+    """
+    seed_contacts(repository)
+    change_contacts(repository)
+
+    contacts = list(repository.get_all_contacts().values())
+    assert read_all_pages(repository, "phone", 6) == sorted(contact.phone for contact in contacts)
+    assert read_all_pages(repository, "name", 6) == [
+        contact.phone for contact in sorted(contacts, key=lambda contact: (contact.name.casefold(), contact.phone))
+    ]
+
+
+
+def test_name_search_follows_changes(repository):
+    """
+    Test that substring search by name sees added, edited and deleted contacts.
+
+    Args:
+        repository (ContactRepository): The repository instance.
+    """
+    seed_contacts(repository, count=14)
+    assert [contact.phone for contact in repository.search_by_name("ёлк")] == ["+79000000004", "+79000000011"]
+    assert repository.search_by_name("IVANOV") == repository.search_by_name("ivanov")
+
+    repository.edit_contact("+79000000004", "Ёлкина Анна", "user4@example.com")
+    repository.delete_contact("+79000000011")
+    repository.apply_batch([
+        BatchOperation(op="add", phone="+79000000100", name="Сёмин Ёлкин", email="new@example.com"),
+        BatchOperation(op="edit", phone="+79000000000", name="Пётр Ёлкин"),
+    ], atomic=True)
+
+    assert [contact.phone for contact in repository.search_by_name("ёлкин")] == [
+        "+79000000000", "+79000000004", "+79000000100"
+    ]
+    assert repository.search_by_name("ёлкин пётр") == []
+    assert [contact.phone for contact in repository.search_by_name("пёт")] == ["+79000000000"]
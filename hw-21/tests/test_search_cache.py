@@ -0,0 +1,54 @@
+from app.utils.cache import VersionedLRUCache
+from conftest import add_contact
+
+
+
+def test_cache_is_invalidated_by_new_version():
+    """
+    Test that entries stored for one version are not returned for another.
+    """
+    cache = VersionedLRUCache(maxsize=2)
+    cache.put("ivan", 1, b"[1]")
+    assert cache.get("ivan", 1) == b"[1]"
+    assert cache.get("ivan", 2) is None
+    assert cache.get("ivan", 1) is None
+    assert cache.stats()["size"] == 0
+
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    Test that the cache keeps at most maxsize entries and drops the oldest one.
+    """
+    cache = VersionedLRUCache(maxsize=2)
+    cache.put("a", 1, 1)
+    cache.put("b", 1, 2)
+    cache.get("a", 1)
+    cache.put("c", 1, 3)
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == 1
+    assert cache.get("c", 1) == 3
+
+
+
+def test_search_cache_follows_version(client):
+    """
+    Test that a cached search result is reused until the book changes.
+
+    Args:
+        client (TestClient): The test client.
+    """
+    assert client.get("/api/contacts/search/", params={"name": "Kraken"}).status_code == 404
+    hits = client.get("/api/cache/stats").json()["search"]["hits"]
+    assert client.get("/api/contacts/search/", params={"name": "Kraken"}).status_code == 404
+    assert client.get("/api/cache/stats").json()["search"]["hits"] == hits + 1
+
+    add_contact(client, "+10000000301", "Kraken Deep")
+    response = client.get("/api/contacts/search/", params={"name": "Kraken"})
+    assert response.status_code == 200
+    assert [contact["phone"] for contact in response.json()] == ["+10000000301"]
+
+    client.patch("/api/contacts/+10000000301", params={"name": "Squid Deep", "email": ""})
+    assert client.get("/api/contacts/search/", params={"name": "Kraken"}).status_code == 404
+    response = client.get("/api/contacts/search/", params={"name": "squid deep", "exact": True})
+    assert [contact["name"] for contact in response.json()] == ["Squid Deep"]
@@ -0,0 +1,45 @@
+import asyncio
+from app.utils.singleflight import SingleFlight
+
+
+
+def test_single_flight_runs_once():
+    """
+    Test that concurrent calls with the same key share one computation.
+    """
+    single_flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        return await asyncio.gather(*(single_flight.do("key", compute) for _ in range(5)))
+
+    assert asyncio.run(main()) == [1] * 5
+    assert single_flight.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+
+
+def test_single_flight_shares_errors():
+    """
+    Test that every waiting caller gets the error of the shared computation,
+    and the next call starts a new one.
+    """
+    single_flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    async def main():
+        results = await asyncio.gather(
+            single_flight.do("key", fail), single_flight.do("key", fail), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+        return await single_flight.do("key", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(main()) == "ok"
+    assert single_flight.stats()["started"] == 2
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+from app.models.contact import Contact
+from app.utils.snapshot_scheduler import SnapshotScheduler
+from conftest import make_repository
+
+
+
+def run_snapshot(repository):
+    """
+    Take one background snapshot on a fresh event loop.
+
+    Returns:
+        tuple: Whether the snapshot was written and the event loop thread.
+    """
+    scheduler = SnapshotScheduler(repository, interval=0, dirty_threshold=1)
+
+    async def main():
+        return await scheduler.snapshot(), threading.current_thread()
+
+    return asyncio.run(main())
+
+
+
+def test_snapshot_runs_off_event_loop(tmp_path):
+    """
+    Test that a snapshot is written, resets the change count and the log,
+    and finishes in a worker thread rather than on the event loop.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the storage files.
+    """
+    repository = make_repository("memory", tmp_path)
+    finish_threads = []
+    finish_snapshot = repository.finish_snapshot
+
+    def record_finish_thread():
+        finish_threads.append(threading.current_thread())
+        finish_snapshot()
+
+    repository.finish_snapshot = record_finish_thread
+    try:
+        repository.add_contact(Contact(name="Ivanov Peter", phone="+1234567890", email="ivanov.peter@example.com"))
+        written, loop_thread = run_snapshot(repository)
+
+        assert written
+        assert finish_threads and finish_threads[0] is not loop_thread
+        assert repository.dirty == 0
+        assert repository.wal.size() == 0
+        with open(repository.filename, encoding="utf-8") as file:
+            assert json.load(file) == {"+1234567890": ["Ivanov Peter", "ivanov.peter@example.com"]}
+    finally:
+        repository.close()
+
+
+
+def test_failed_snapshot_keeps_changes(tmp_path):
+    """
+    Test that a snapshot that fails to write keeps the change count, so it is retried.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory for the storage files.
+    """
+    repository = make_repository("memory", tmp_path)
+    write_snapshot = repository.write_snapshot
+
+    def fail(data):
+        raise OSError("disk full")
+
+    repository.write_snapshot = fail
+    try:
+        repository.add_contact(Contact(name="Ivanov Peter", phone="+1234567890", email="ivanov.peter@example.com"))
+        written, _ = run_snapshot(repository)
+        assert not written
+        assert repository.dirty == 1
+        assert repository.needs_snapshot(1)
+    finally:
+        repository.write_snapshot = write_snapshot
+        repository.close()
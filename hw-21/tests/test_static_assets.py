@@ -0,0 +1,16 @@
+def test_static_head(client):
+    """
+    Test that HEAD on a static file returns the GET headers without a body.
+
+    Args:
+        client (TestClient): The test client.
+    """
+    for accept_encoding in ("gzip", "identity"):
+        headers = {"Accept-Encoding": accept_encoding}
+        get = client.get("/static/css/style.css", headers=headers)
+        head = client.head("/static/css/style.css", headers=headers)
+        assert head.status_code == get.status_code == 200
+        assert head.content == b""
+        for name in ("Content-Length", "Content-Type", "Content-Encoding", "ETag", "Cache-Control"):
+            assert head.headers.get(name) == get.headers.get(name)
+    assert client.head("/static/missing.css").status_code == 404
@@ -0,0 +1,138 @@
+import os
+import pytest
+from app.models.contact import Contact, ContactBook
+from app.utils.wal import OP_ADD, OP_DELETE, OP_EDIT, WriteAheadLog
+from app.exceptions import InvalidDataFormatError
+
+
+
+def test_replay_applies_operations(wal, contact_book):
+    """
+    Test that replaying the log restores adds, edits, deletes and batches in order.
+
+    Args:
+        wal (WriteAheadLog): The write-ahead log instance.
+        contact_book (ContactBook): The contact book to replay into.
+    """
+    wal.append(OP_ADD, "+1234567890", "Ivanov Peter", "ivanov.peter@example.com")
+    wal.append(OP_ADD, "+1234567891", "Petrov Ivan", "petrov.ivan@example.com")
+    wal.append(OP_EDIT, "+1234567890", "Ivanov Petr", "ivanov.petr@example.com")
+    wal.append_batch([
+        (OP_DELETE, "+1234567891", None, None),
+        (OP_ADD, "+1234567892", "Sidorov Oleg", "sidorov.oleg@example.com"),
+    ])
+    wal.close()
+
+    assert wal.replay(contact_book) == 5
+    assert contact_book.get_all_contacts() == {
+        "+1234567890": Contact(name="Ivanov Petr", phone="+1234567890", email="ivanov.petr@example.com"),
+        "+1234567892": Contact(name="Sidorov Oleg", phone="+1234567892", email="sidorov.oleg@example.com"),
+    }
+
+
+
+def test_replay_is_idempotent(wal):
+    """
+    Test that replaying the same log twice gives the same contact book.
+
+    Args:
+        wal (WriteAheadLog): The write-ahead log instance.
+    """
+    wal.append(OP_ADD, "+1234567890", "Ivanov Peter", "ivanov.peter@example.com")
+    wal.append(OP_DELETE, "+1234567890")
+    wal.append(OP_ADD, "+1234567891", "Petrov Ivan", "petrov.ivan@example.com")
+    wal.close()
+
+    contact_book = ContactBook()
+    wal.replay(contact_book)
+    wal.replay(contact_book)
+    assert list(contact_book.get_all_contacts()) == ["+1234567891"]
+
+
+
+def test_replay_includes_rotated_log(wal, contact_book):
+    """
+    Test that changes in the rotated log are replayed before the current log.
+
+    Args:
+        wal (WriteAheadLog): The write-ahead log instance.
+        contact_book (ContactBook): The contact book to replay into.
+    """
+    wal.append(OP_ADD, "+1234567890", "Ivanov Peter", "ivanov.peter@example.com")
+    wal.rotate()
+    wal.append(OP_EDIT, "+1234567890", "Ivanov Petr", "ivanov.peter@example.com")
+    wal.close()
+
+    assert wal.replay(contact_book) == 2
+    assert contact_book.find_contact("+1234567890").name == "Ivanov Petr"
+
+
+
+def test_replay_truncates_torn_record(wal, contact_book):
+    """
+    Test that a record cut off by a crash is dropped and removed from the file,
+    so the next append starts on a clean line.
+
+    Args:
+        wal (WriteAheadLog): The write-ahead log instance.
+        contact_book (ContactBook): The contact book to replay into.
+    """
+    wal.append(OP_ADD, "+1234567890", "Ivanov Peter", "ivanov.peter@example.com")
+    wal.close()
+    with open(wal.filename, "rb") as file:
+        complete = file.read()
+    with open(wal.filename, "ab") as file:
+        file.write('{"op": "add", "phone": "+1234567891", "name": "Петров'.encode("utf-8"))
+
+    assert wal.replay(contact_book) == 1
+    assert contact_book.find_contact("+1234567891") is None
+    with open(wal.filename, "rb") as file:
+        assert file.read() == complete
+
+    wal.append(OP_ADD, "+1234567892", "Sidorov Oleg", "sidorov.oleg@example.com")
+    wal.close()
+    contact_book = ContactBook()
+    assert wal.replay(contact_book) == 2
+    assert sorted(contact_book.get_all_contacts()) == ["+1234567890", "+1234567892"]
+
+
+
+def test_replay_rejects_corrupted_record(wal, contact_book):
+    """
+    Test that a complete but invalid record stops the replay with an error.
+
+    Args:
+        wal (WriteAheadLog): The write-ahead log instance.
+        contact_book (ContactBook): The contact book to replay into.
+    """
+    wal.append(OP_ADD, "+1234567890", "Ivanov Peter", "ivanov.peter@example.com")
+    wal.close()
+    with open(wal.filename, "a", encoding="utf-8") as file:
+        file.write("not json\n")
+
+    with pytest.raises(InvalidDataFormatError):
+        wal.replay(contact_book)
+
+
+
+def test_size_is_tracked_without_the_file(wal):
+    """
+    Test that size() follows appends and rotation and stays readable
+    while the log file is closed or being replaced.
+
+    Args:
+        wal (WriteAheadLog): The write-ahead log instance.
+    """
+    assert wal.size() == 0
+    wal.append(OP_ADD, "+1234567890", "Ёлкин Пётр", "elkin@example.com")
+    wal.append_batch([(OP_DELETE, "+1234567890", None, None)])
+    assert wal.size() == os.path.getsize(wal.filename)
+
+    wal.close()
+    assert wal.size() == os.path.getsize(wal.filename)
+    assert WriteAheadLog(wal.filename).size() == wal.size()
+
+    wal.rotate()
+    assert wal.size() == 0
+    wal.append(OP_DELETE, "+1234567891")
+    assert wal.size() == os.path.getsize(wal.filename)
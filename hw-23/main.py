@@ -1,8 +1,15 @@
 from fastapi import FastAPI, status
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
+from metrics import CONTENT_TYPE, HTTPMetrics, MetricsMiddleware
 
 app = FastAPI()
+http_metrics = HTTPMetrics()
+app.add_middleware(MetricsMiddleware, metrics=http_metrics)
 
 @app.get('/ping/', status_code=status.HTTP_200_OK)
 async def ping():
-    return {'message': 'pong'}
\ No newline at end of file
+    return {'message': 'pong'}
+
+@app.get('/metrics', include_in_schema=False)
+async def metrics():
+    return Response(content=http_metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,122 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Prometheus-style histogram: per-bucket counts, sum and count."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    return '{' + ','.join(f'{name}="{escape_label(str(value))}"' for name, value in labels.items()) + '}' if labels else ''
+
+
+def render_histogram(name, help_text, histograms):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for labels, histogram in histograms:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{format_labels({**labels, "le": bound})} {cumulative}')
+        lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum}')
+        lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+    return lines
+
+
+class HTTPMetrics:
+    """Per-route request counts, latency and response size histograms, in-flight requests.
+
+    Updated only from the event loop, so no locking is needed. The route label is the
+    path template, so the number of series does not grow with distinct URLs.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.requests = defaultdict(int)
+        self.latency = defaultdict(Histogram)
+        self.response_size = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.in_flight = 0
+
+    def observe(self, method, route, status, duration, size):
+        self.requests[(method, route, str(status))] += 1
+        self.latency[(method, route)].observe(duration)
+        self.response_size[(method, route)].observe(size)
+
+    def render(self):
+        lines = ['# HELP http_requests_total HTTP requests by route and status.', '# TYPE http_requests_total counter']
+        lines += [
+            f'http_requests_total{format_labels({"method": method, "route": route, "status": status})} {count}'
+            for (method, route, status), count in sorted(self.requests.items())
+        ]
+        lines += render_histogram(
+            'http_request_duration_seconds', 'Time until the last byte of the response was sent.',
+            (({'method': method, 'route': route}, histogram) for (method, route), histogram in sorted(self.latency.items())),
+        )
+        lines += render_histogram(
+            'http_response_size_bytes', 'Response body size in bytes.',
+            (({'method': method, 'route': route}, histogram) for (method, route), histogram in sorted(self.response_size.items())),
+        )
+        lines += [
+            '# HELP http_requests_in_flight Requests being processed.',
+            '# TYPE http_requests_in_flight gauge',
+            f'http_requests_in_flight {self.in_flight}',
+            '# HELP process_start_time_seconds Start time of the process since the epoch.',
+            '# TYPE process_start_time_seconds gauge',
+            f'process_start_time_seconds {self.started_at}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records every HTTP request into HTTPMetrics."""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            self.metrics.in_flight -= 1
+            route = scope.get('route')
+            self.metrics.observe(
+                scope['method'], route.path if route is not None else 'unmatched', status,
+                time.perf_counter() - started, size,
+            )